@@ -4,12 +4,14 @@ Camera management routes - FINAL WORKING VERSION WITH DATABASE LOGGING
 from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from typing import Optional
 import cv2
 import asyncio
 import logging
+import queue
 
 from app.services.camera_manager import camera_manager
-from app.services.hand_detector import hand_detector
+from app.services.hand_detector import hand_detector_pool
 from app.services.feature_processor import feature_processor
 from app.services.gesture_recognizer import gesture_recognizer
 from app.services.gesture_controller import gesture_controller
@@ -19,6 +21,9 @@ from app.services.gesture_logger_utility import log_gesture_event
 
 logger = logging.getLogger(__name__)
 
+# Seconds a new stream waits for a free pooled detector
+DETECTOR_TIMEOUT = 5.0
+
 router = APIRouter(prefix="/cameras", tags=["cameras"])
 
 # ============================================================================
@@ -36,6 +41,7 @@ class AddCameraRequest(BaseModel):
     name: str
     source: str
     type: str
+    fourcc: Optional[str] = None  # USB pixel format, e.g. 'MJPG'
 
 class ModeRequest(BaseModel):
     """Request model for setting detection mode"""
@@ -101,7 +107,9 @@ async def add_camera(request: AddCameraRequest):
             camera_id = len(camera_manager.cameras)
         
         # Add camera to manager
-        success = camera_manager.add_camera(camera_id, request.source, request.type)
+        success = camera_manager.add_camera(
+            camera_id, request.source, request.type, fourcc=request.fourcc
+        )
         
         print(f"➕ Adding camera: id={camera_id}, type={request.type}, source={request.source}, success={success}")
         
@@ -173,6 +181,20 @@ async def detection_websocket(websocket: WebSocket, camera_id: int):
     
     frame_counter = 0
     
+    # Own detector for this stream (its tracking state must only see this
+    # camera's frames); detection runs off the event loop so several
+    # cameras are processed in parallel
+    try:
+        hand_detector = await asyncio.to_thread(hand_detector_pool.get, DETECTOR_TIMEOUT)
+    except queue.Empty:
+        logger.warning(f"⚠️ No free hand detector for camera {camera_id}, closing stream")
+        await websocket.close(code=1013, reason="All detectors busy, try again later")
+        return
+    
+    def detect(frame):
+        rgb_frame, results = hand_detector.detect_hands(frame)
+        return hand_detector.get_hand_info(results), hand_detector.extract_landmarks_array(results)
+    
     try:
         while True:
             try:
@@ -190,9 +212,7 @@ async def detection_websocket(websocket: WebSocket, camera_id: int):
                     continue
 
                 # 1. Detect hands
-                rgb_frame, results = hand_detector.detect_hands(frame)
-                hands_info = hand_detector.get_hand_info(results)
-                landmarks_list = hand_detector.extract_landmarks(results)
+                hands_info, landmarks_array = await asyncio.to_thread(detect, frame)
                 
                 detection_data = {
                     "timestamp": cv2.getTickCount(),
@@ -202,19 +222,18 @@ async def detection_websocket(websocket: WebSocket, camera_id: int):
                 }
 
                 # 2. Process gestures if hands detected
-                if hands_info and landmarks_list:
-                    for i, hand in enumerate(hands_info):
-                        label = "Unknown"
-                        confidence = 0.0
-                        
+                if hands_info and len(landmarks_array):
+                    # One feature pass + one model call for all hands in the frame
+                    try:
+                        features = feature_processor.extract_features_batch(landmarks_array)
+                        predictions = gesture_recognizer.predict_batch(features)
+                    except Exception as e:
+                        if frame_counter % 100 == 0:
+                            logger.error(f"Prediction error: {e}")
+                        predictions = [("Unknown", 0.0)] * len(hands_info)
+                    
+                    for i, (hand, (label, confidence)) in enumerate(zip(hands_info, predictions)):
                         try:
-                            # Extract features from landmarks
-                            landmarks = landmarks_list[i]
-                            features = feature_processor.extract_features(landmarks)
-                            
-                            # Predict gesture using ML model
-                            label, confidence = gesture_recognizer.predict(features)
-                            
                             # Process controller logic (only for first hand)
                             if i == 0:
                                 controller_result = gesture_controller.process_gesture(label, confidence)
@@ -278,6 +297,8 @@ async def detection_websocket(websocket: WebSocket, camera_id: int):
             await websocket.close(code=1011, reason="Internal server error")
         except:
             pass
+    finally:
+        hand_detector_pool.release(hand_detector)
 
 # ============================================================================
 # HELPER FUNCTIONS
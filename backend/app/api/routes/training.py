@@ -9,6 +9,7 @@ Uproszczone: tylko lista gestów, zbieranie danych, trenowanie.
 """
 
 import asyncio
+import queue
 import time
 import json
 import subprocess
@@ -24,11 +25,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.models.gesture import Gesture
 from app.services.camera_manager import camera_manager
-from app.services.hand_detector import hand_detector
+from app.services.hand_detector import hand_detector_pool
 from app.utils.image_processor import image_processor
 
 router = APIRouter(prefix="/training", tags=["training"])
 
+# Seconds collection waits for a free pooled detector
+DETECTOR_TIMEOUT = 5.0
+
 # -------------------- STAN GLOBALNY --------------------
 
 
@@ -162,6 +166,14 @@ async def _collect_data_loop(gesture_name: str, target: int):
 
     print(f"[COLLECT] Start collecting for {gesture_name}, target={target}")
 
+    # Own detector for the whole run (tracking state from this camera only)
+    try:
+        hand_detector = await asyncio.to_thread(hand_detector_pool.get, DETECTOR_TIMEOUT)
+    except queue.Empty:
+        print("[COLLECT] Error: no free hand detector")
+        state.is_collecting = False
+        return
+
     try:
         while state.is_collecting and state.samples_collected < target:
             frame = camera_manager.get_frame(0)
@@ -170,7 +182,7 @@ async def _collect_data_loop(gesture_name: str, target: int):
                 continue
 
             # detekcja dłoni
-            rgb, results = hand_detector.detect_hands(frame)
+            rgb, results = await asyncio.to_thread(hand_detector.detect_hands, frame)
             if results and results.multi_hand_landmarks:
                 timestamp = int(time.time() * 1000)
                 idx = state.samples_collected
@@ -187,6 +199,7 @@ async def _collect_data_loop(gesture_name: str, target: int):
     except Exception as e:
         print(f"[COLLECT] Error: {e}")
     finally:
+        hand_detector_pool.release(hand_detector)
         state.is_collecting = False
         print(f"[COLLECT] Finished for {gesture_name}, collected={state.samples_collected}")
 
@@ -261,15 +274,20 @@ def _run_training_pipeline():
         state.training_status = "preparing"
         state.training_progress = 10
 
-        # 1. Przetwarzanie obrazów
-        print("[TRAIN] Step 1/3: process_dataset_structure")
-        image_processor.process_dataset_structure("data/collected")
-        state.training_progress = 40
-
-        # 2. Łączenie danych
-        print("[TRAIN] Step 2/3: combine_processed_data")
-        image_processor.combine_processed_data("combined_all_datasets.npz")
-        state.training_progress = 60
+        try:
+            # 1. Przetwarzanie obrazów
+            print("[TRAIN] Step 1/3: process_dataset_structure")
+            image_processor.process_dataset_structure("data/collected")
+            state.training_progress = 40
+
+            # 2. Łączenie danych
+            print("[TRAIN] Step 2/3: combine_processed_data")
+            image_processor.combine_processed_data("combined_all_datasets.npz")
+            state.training_progress = 60
+        finally:
+            # Stop the image worker processes, they are not needed until
+            # the next training run
+            image_processor.shutdown_workers()
 
         # 3. Trenowanie modelu – korzystamy z istniejącego scripts/train_model.py
         print("[TRAIN] Step 3/3: run train_model.py")
@@ -12,6 +12,8 @@ from app.core.config import settings
 from app.core.database import init_db, async_session_maker
 from app.core.init_data import init_default_gestures
 from app.services.camera_manager import camera_manager
+from app.services.hand_detector import hand_detector_pool
+from app.services.system_manager import system_manager
 
 
 logging.basicConfig(
@@ -118,6 +120,11 @@ async def lifespan(app: FastAPI):
     camera_manager.cleanup()
     logger.info("📷 Camera manager cleaned up")
     
+    hand_detector_pool.cleanup()
+    logger.info("🖐️ Hand detector pool cleaned up")
+    
+    await system_manager.close()
+    
     if cleanup_task:
         try:
             cleanup_task.cancel()
@@ -4,14 +4,20 @@ Handles multiple camera sources (USB, IP, File)
 with extended settings support for UI sliders.
 """
 
-from typing import List, Optional, Dict, Union
+from typing import List, Optional, Dict, Tuple, Union
 
 import cv2
 import numpy as np
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# A grab() that returns faster than this came from the driver queue;
+# a slower one waited for the sensor, i.e. it is the live frame
+LIVE_GRAB_SECONDS = 0.005
+
 
 class CameraManager:
     """Manages multiple camera sources - USB, IP (RTSP), and video files"""
@@ -21,6 +27,9 @@ class CameraManager:
         self.camera_configs: Dict[int, dict] = {}
         self.camera_settings: Dict[int, dict] = {}
         self.active_cameras: List[dict] = []
+        # Per-camera lock: a capture is never released while a read on it
+        # is in flight (streams read on other threads than cleanup)
+        self._locks: Dict[int, threading.RLock] = {}
 
     # ---------- discovery ----------
 
@@ -51,8 +60,33 @@ class CameraManager:
 
     # ---------- lifecycle ----------
     
-    def add_camera(self, camera_id: int, source: Union[int, str], camera_type: str = 'usb') -> bool:
-        """Add a new camera with optimized settings"""
+    def add_camera(
+        self,
+        camera_id: int,
+        source: Union[int, str],
+        camera_type: str = 'usb',
+        resolution: Tuple[int, int] = (640, 480),
+        fps: int = 30,
+        fourcc: Optional[str] = None,
+    ) -> bool:
+        """
+        Add a new camera with optimized settings
+
+        Args:
+            camera_id: Camera ID
+            source: USB index, stream URL or video file path
+            camera_type: 'usb', 'ip' or 'file'
+            resolution: Requested capture size (width, height). MediaPipe
+                        downsamples to 256x256 anyway, so larger frames only
+                        cost USB bandwidth and color-conversion time
+            fps: Requested capture FPS
+            fourcc: USB pixel format, e.g. 'MJPG' to have the webcam compress
+                    frames (~100 KB instead of ~1 MB raw over USB). Not
+                    every camera supports it; None keeps the driver default
+
+        Returns:
+            True if the camera was opened
+        """
         try:
             if camera_id in self.cameras:
                 logger.warning(f"Camera {camera_id} already exists")
@@ -77,10 +111,14 @@ class CameraManager:
                 logger.error(f"Failed to open camera {camera_id}")
                 return False
             
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+            # Pixel format first: drivers pick the modes available for it
+            if camera_type == 'usb' and fourcc:
+                cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+            
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
             
-            cap.set(cv2.CAP_PROP_FPS, 30)
+            cap.set(cv2.CAP_PROP_FPS, fps)
             
             cap.set(cv2.CAP_PROP_AUTOFOCUS, 0)
             
@@ -91,6 +129,7 @@ class CameraManager:
             height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             fps = int(cap.get(cv2.CAP_PROP_FPS))
             
+            self._locks.setdefault(camera_id, threading.RLock())
             self.cameras[camera_id] = cap
 
             # Store config
@@ -99,7 +138,8 @@ class CameraManager:
                 'source': source,
                 'type': camera_type,
                 'resolution': (width, height),
-                'fps': fps
+                'fps': fps,
+                'fourcc': fourcc if camera_type == 'usb' else None
             }
 
             # Initialize default settings
@@ -123,10 +163,10 @@ class CameraManager:
         """Remove a camera"""
         if camera_id in self.cameras:
             logger.info(f"Removing camera {camera_id}")
-            self.cameras[camera_id].release()
-            del self.cameras[camera_id]
-            self.camera_configs.pop(camera_id, None)
-            self.camera_settings.pop(camera_id, None)
+            with self._locks[camera_id]:
+                self.cameras.pop(camera_id).release()
+                self.camera_configs.pop(camera_id, None)
+                self.camera_settings.pop(camera_id, None)
             logger.info(f"✅ Camera {camera_id} removed")
             return True
 
@@ -136,32 +176,87 @@ class CameraManager:
     def cleanup(self):
         """Release all cameras"""
         logger.info("Cleaning up cameras...")
-        for camera_id, cap in self.cameras.items():
-            cap.release()
+        for camera_id in list(self.cameras):
+            # Waits for a read in progress on this camera to finish
+            with self._locks[camera_id]:
+                self.cameras.pop(camera_id).release()
+                self.camera_configs.pop(camera_id, None)
+                self.camera_settings.pop(camera_id, None)
             logger.info(f"Released camera {camera_id}")
-        self.cameras.clear()
-        self.camera_configs.clear()
-        self.camera_settings.clear()
         logger.info("✅ All cameras released")
 
     # ---------- frames ----------
 
     def get_frame(self, camera_id: int) -> Optional[np.ndarray]:
         """Get a frame from camera"""
-        if camera_id not in self.cameras:
+        lock = self._locks.get(camera_id)
+        if lock is None:
             logger.warning(f"Camera {camera_id} not found")
             return None
 
-        try:
-            ret, frame = self.cameras[camera_id].read()
-            if ret:
-                return frame
-            logger.warning(f"Failed to read frame from camera {camera_id}")
-            return None
-        except Exception as e:
-            logger.error(f"Error reading frame from camera {camera_id}: {e}", exc_info=True)
+        with lock:
+            # Re-checked under the lock: cleanup may have released it
+            cap = self.cameras.get(camera_id)
+            if cap is None:
+                logger.warning(f"Camera {camera_id} not found")
+                return None
+
+            try:
+                ret, frame = cap.read()
+                if ret:
+                    return frame
+                logger.warning(f"Failed to read frame from camera {camera_id}")
+                return None
+            except Exception as e:
+                logger.error(f"Error reading frame from camera {camera_id}: {e}", exc_info=True)
+                return None
+
+    def get_latest_frame(self, camera_id: int, max_grabs: int = 5) -> Optional[np.ndarray]:
+        """
+        Get the newest frame, dropping frames queued by the driver
+
+        Slow consumers (e.g. detection + inference per frame) otherwise
+        read frames that waited in the capture buffer, lagging behind the
+        user. Queued frames are skipped with cheap grab() calls (no
+        decode) until a grab has to wait for the camera; only that frame
+        is decoded. Video files are read frame by frame as in get_frame.
+
+        Args:
+            camera_id: Camera ID
+            max_grabs: Upper bound on grabs per call
+
+        Returns:
+            BGR frame or None
+        """
+        lock = self._locks.get(camera_id)
+        if lock is None:
+            logger.warning(f"Camera {camera_id} not found")
             return None
 
+        with lock:
+            cap = self.cameras.get(camera_id)
+            if cap is None:
+                logger.warning(f"Camera {camera_id} not found")
+                return None
+
+            if self.camera_configs[camera_id]['type'] == 'file':
+                return self.get_frame(camera_id)
+
+            try:
+                for _ in range(max_grabs):
+                    start = time.perf_counter()
+                    if not cap.grab():
+                        logger.warning(f"Failed to grab frame from camera {camera_id}")
+                        return None
+                    if time.perf_counter() - start > LIVE_GRAB_SECONDS:
+                        break
+
+                ret, frame = cap.retrieve()
+                return frame if ret else None
+            except Exception as e:
+                logger.error(f"Error reading frame from camera {camera_id}: {e}", exc_info=True)
+                return None
+
     # ---------- configuration ----------
 
     def configure_camera(
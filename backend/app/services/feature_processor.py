@@ -3,12 +3,81 @@ Feature Processor
 Converts hand landmarks to ML features
 """
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Union
 import math
 import logging
+import os
+
+from app.utils.landmark_ops import (
+    normalize,
+    compute_features,
+    FINGER_TIPS,
+    PALM_POINTS,
+    ANGLE_A,
+    ANGLE_VERTEX,
+    ANGLE_B,
+    NUM_FEATURES,
+)
 
 logger = logging.getLogger(__name__)
 
+
+def _row_norms(vectors: np.ndarray) -> np.ndarray:
+    """Euclidean norm along the last axis of a (..., 3) array"""
+    return np.sqrt(np.einsum('...i,...i->...', vectors, vectors))
+
+
+def _normalize_points(points: np.ndarray) -> np.ndarray:
+    """
+    Wrist-centered, scale-normalized landmarks for a (B, 21, 3) batch
+    (Numba kernel when available, see app.utils.landmark_ops)
+    """
+    return normalize(points, np.empty_like(points))
+
+
+def _compute_features(points: np.ndarray) -> np.ndarray:
+    """
+    Compute feature vectors from raw (B, 21, 3) landmark points
+
+    Uses the compiled loop kernel from app.utils.landmark_ops when Numba
+    is installed. Otherwise a single vectorized pass: every distance and
+    angle group is computed with one NumPy call instead of per-feature
+    calls. Produces the same layout as calculate_distances/calculate_angles.
+    
+    Math runs in float64; the result is stored as float32, the dtype the
+    model is trained and run on, so no per-prediction conversion copy.
+    
+    Returns:
+        Feature matrix (B, 83), float32
+    """
+    if compute_features is not None:
+        return compute_features(points, np.empty((len(points), NUM_FEATURES), dtype=np.float32))
+    
+    normalized = _normalize_points(points)
+    batch_size = len(normalized)
+
+    features = np.empty((batch_size, NUM_FEATURES), dtype=np.float32)
+    features[:, :63] = normalized.reshape(batch_size, 63)
+
+    # Distances (wrist is the origin after centering)
+    tips = normalized[:, FINGER_TIPS]
+    palm_center = normalized[:, PALM_POINTS].mean(axis=1, keepdims=True)
+    features[:, 63:68] = _row_norms(tips)
+    features[:, 68:73] = _row_norms(tips - palm_center)
+    features[:, 73:77] = _row_norms(tips[:, 1:] - tips[:, :-1])
+
+    # Angles
+    vertex = normalized[:, ANGLE_VERTEX]
+    vectors1 = normalized[:, ANGLE_A] - vertex
+    vectors2 = normalized[:, ANGLE_B] - vertex
+    vectors1 /= (_row_norms(vectors1) + 1e-10)[..., None]
+    vectors2 /= (_row_norms(vectors2) + 1e-10)[..., None]
+    cosines = np.clip(np.einsum('...i,...i->...', vectors1, vectors2), -1.0, 1.0)
+    features[:, 77:83] = np.degrees(np.arccos(cosines))
+
+    return features
+
+
 class FeatureProcessor:
     """
     Processes hand landmarks into ML features
@@ -43,42 +112,46 @@ class FeatureProcessor:
         """Initialize Feature Processor"""
         logger.info("FeatureProcessor initialized")
     
+    def _landmarks_to_points(
+        self,
+        landmarks: Union[np.ndarray, List[dict]]
+    ) -> np.ndarray:
+        """Convert 21 landmarks (dicts or a (21, 3) array) to a float64 (21, 3) array"""
+        if len(landmarks) != 21:
+            raise ValueError(f"Expected 21 landmarks, got {len(landmarks)}")
+        
+        if isinstance(landmarks, np.ndarray):
+            return np.ascontiguousarray(landmarks, dtype=np.float64).reshape(21, 3)
+        
+        return np.array([[lm['x'], lm['y'], lm['z']] for lm in landmarks])
+    
     def normalize_landmarks(
         self,
-        landmarks: List[dict]
+        landmarks: Union[np.ndarray, List[dict]]
     ) -> np.ndarray:
         """
         Normalize landmarks to be translation and scale invariant
         
         Args:
-            landmarks: List of 21 landmark dicts with x, y, z
+            landmarks: List of 21 landmark dicts with x, y, z, or a (21, 3) array
             
         Returns:
             Normalized landmarks as numpy array (21, 3)
         """
-        if len(landmarks) != 21:
-            raise ValueError(f"Expected 21 landmarks, got {len(landmarks)}")
-        
-        # Convert to numpy array
-        points = np.array([[lm['x'], lm['y'], lm['z']] for lm in landmarks])
-        
-        # Get wrist point (landmark 0) as reference
-        wrist = points[0]
-        
-        # Translate to wrist origin
-        points_centered = points - wrist
-        
-        # Calculate scale (max distance from wrist)
-        distances = np.linalg.norm(points_centered, axis=1)
-        max_distance = np.max(distances)
-        
-        # Scale normalization
-        if max_distance > 0:
-            points_normalized = points_centered / max_distance
-        else:
-            points_normalized = points_centered
+        points = self._landmarks_to_points(landmarks)
+        return self.normalize_landmarks_batch(points[None])[0]
+    
+    def normalize_landmarks_batch(self, points: np.ndarray) -> np.ndarray:
+        """
+        Normalize a batch of hands (e.g. all hands across cameras) at once
         
-        return points_normalized
+        Args:
+            points: Landmark array (B, 21, 3)
+            
+        Returns:
+            Normalized landmarks (B, 21, 3)
+        """
+        return _normalize_points(np.ascontiguousarray(points, dtype=np.float64))
     
     def calculate_distances(
         self,
@@ -211,39 +284,43 @@ class FeatureProcessor:
     
     def extract_features(
         self,
-        landmarks: List[dict]
+        landmarks: Union[np.ndarray, List[dict]]
     ) -> np.ndarray:
         """
         Extract complete feature vector from landmarks
         
         Args:
-            landmarks: List of 21 landmark dicts
+            landmarks: List of 21 landmark dicts or a (21, 3) array
             
         Returns:
-            Feature vector as numpy array
+            Feature vector (83,), float32
         """
-        # Normalize landmarks
-        normalized_landmarks = self.normalize_landmarks(landmarks)
-        
-        # Flatten normalized landmarks (21 * 3 = 63 values)
-        landmark_features = normalized_landmarks.flatten()
-        
-        # Calculate distances
-        distances = self.calculate_distances(normalized_landmarks)
-        distance_features = np.array(list(distances.values()))
+        # Layout: 63 normalized coordinates, 14 distances, 6 angles
+        points = self._landmarks_to_points(landmarks)
+        return _compute_features(points[None])[0]
+    
+    def extract_features_batch(
+        self,
+        hands: Union[np.ndarray, List[List[dict]]]
+    ) -> np.ndarray:
+        """
+        Extract feature vectors for several hands in one vectorized pass
         
-        # Calculate angles
-        angles = self.calculate_angles(normalized_landmarks)
-        angle_features = np.array(list(angles.values()))
+        Args:
+            hands: Landmark array (B, 21, 3) or list of B hands of 21 landmark dicts
+            
+        Returns:
+            Feature matrix (B, 83), float32
+        """
+        if isinstance(hands, np.ndarray):
+            points = np.ascontiguousarray(hands, dtype=np.float64)
+        else:
+            points = np.stack([self._landmarks_to_points(hand) for hand in hands])
         
-        # Concatenate all features
-        features = np.concatenate([
-            landmark_features,    # 63 features
-            distance_features,    # ~14 features
-            angle_features        # ~6 features
-        ])
+        if points.ndim != 3 or points.shape[1:] != (21, 3):
+            raise ValueError(f"Expected landmarks of shape (B, 21, 3), got {points.shape}")
         
-        return features
+        return _compute_features(points)
     
     def get_feature_names(self) -> List[str]:
         """
@@ -285,3 +362,7 @@ class FeatureProcessor:
 
 # Global instance
 feature_processor = FeatureProcessor()
+
+# Warm up at startup (set GRS_NO_WARMUP=1 to skip, e.g. in tests)
+if os.getenv('GRS_NO_WARMUP') != '1':
+    feature_processor.extract_features([{'x': 0.0, 'y': 0.0, 'z': 0.0}] * 21)
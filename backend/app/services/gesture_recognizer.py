@@ -8,11 +8,18 @@ import os
 from pathlib import Path
 import logging
 
+try:
+    import onnxruntime as ort
+    HAS_ONNXRUNTIME = True
+except ImportError:
+    HAS_ONNXRUNTIME = False
+
 logger = logging.getLogger(__name__)
 
 class GestureRecognizer:
     def __init__(self, model_dir=None):
         self.model = None
+        self.session = None
         self.label_encoder = None
         
         if model_dir is None:
@@ -26,36 +33,105 @@ class GestureRecognizer:
         self.load_model()
 
     def load_model(self):
-        """Load model from disk"""
+        """Load model from disk (ONNX export preferred, joblib pickle as fallback)"""
         try:
             model_path = self.model_dir / 'gesture_model.pkl'
+            onnx_path = self.model_dir / 'gesture_model.onnx'
             encoder_path = self.model_dir / 'label_encoder.pkl'
             
             logger.info(f"🔍 Looking for model at: {model_path.absolute()}")
             
-            if not model_path.exists():
-                logger.warning(f"❌ Model not found at {model_path}. Please train model first.")
-                return
-            
             if not encoder_path.exists():
                 logger.warning(f"❌ Label encoder not found at {encoder_path}. Please train model first.")
                 return
             
-            self.model = joblib.load(model_path)
-            self.label_encoder = joblib.load(encoder_path)
+            # Load into locals and swap at the end: a reload never leaves
+            # a stale session (or model) from the previous load in place
+            session = model = None
+            if onnx_path.exists() and HAS_ONNXRUNTIME:
+                try:
+                    session = self._create_session(onnx_path)
+                    logger.info(f"✅ ONNX model loaded from {onnx_path}")
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to load ONNX model ({e}), falling back to {model_path.name}")
+            
+            if session is None:
+                if not model_path.exists():
+                    logger.warning(f"❌ Model not found at {model_path}. Please train model first.")
+                    return
+                model = joblib.load(model_path)
+                logger.info(f"✅ ML Model loaded successfully from {model_path}")
             
-            logger.info(f"✅ ML Model loaded successfully from {model_path}")
+            label_encoder = joblib.load(encoder_path)
+            
+            if session is not None:
+                self._input_name = session.get_inputs()[0].name
+                self._proba_name = session.get_outputs()[1].name
+            self.session, self.model, self.label_encoder = session, model, label_encoder
             logger.info(f"   Classes: {len(self.label_encoder.classes_)}")
             
+            # Pay one-time inference setup here, not on the first frame
+            # (set GRS_NO_WARMUP=1 to skip, e.g. in tests)
+            if os.getenv('GRS_NO_WARMUP') != '1':
+                self.warmup()
+            
         except Exception as e:
             logger.error(f"❌ Failed to load model: {e}")
 
+    def _create_session(self, onnx_path: Path):
+        """Create ONNX Runtime session tuned for single-sample latency"""
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        sess_options.intra_op_num_threads = 1
+        sess_options.inter_op_num_threads = 1
+        sess_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        
+        session = ort.InferenceSession(
+            str(onnx_path),
+            sess_options=sess_options,
+            providers=['CPUExecutionProvider']
+        )
+        
+        # Exported with zipmap disabled: outputs are (label, probabilities tensor)
+        outputs = session.get_outputs()
+        if len(outputs) < 2 or not outputs[1].type.startswith('tensor'):
+            raise ValueError("expected a (label, probabilities) export with zipmap disabled")
+        
+        return session
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities for a (N, D) feature batch
+        
+        Runs the ONNX session when loaded (float32 input; passing float32
+        avoids a conversion copy), otherwise the sklearn model. Columns
+        follow label_encoder.classes_.
+        """
+        if self.session is not None:
+            return self.session.run(
+                [self._proba_name],
+                {self._input_name: np.ascontiguousarray(features, dtype=np.float32)}
+            )[0]
+        return self.model.predict_proba(features)
+
+    def warmup(self):
+        """Run one dummy prediction so the first real frame does not pay one-time setup costs"""
+        if self.session is not None:
+            num_features = self.session.get_inputs()[0].shape[1]
+        elif self.model is not None:
+            num_features = self.model.n_features_in_
+        else:
+            return
+        
+        self.predict(np.zeros(num_features, dtype=np.float32))
+        logger.debug("Gesture model warmed up")
+
     def predict(self, features: np.ndarray):
         """
         Predict gesture from features
         Returns: (label, confidence)
         """
-        if self.model is None or self.label_encoder is None:
+        if (self.model is None and self.session is None) or self.label_encoder is None:
             logger.warning("⚠️ Model not loaded! Returning default.")
             return "Model Not Loaded", 0.0
 
@@ -74,13 +150,8 @@ class GestureRecognizer:
             
             logger.debug(f"Predicting with features shape: {features.shape}")
             
-            # Predict
-            prediction_idx = self.model.predict(features)[0]
-            probabilities = self.model.predict_proba(features)[0]
-
-            # Decode label
-            label = self.label_encoder.inverse_transform([prediction_idx])[0]
-            confidence = float(probabilities[prediction_idx])
+            # Single predict_proba pass; label is its argmax
+            label, confidence = self.predict_batch(features[:1])[0]
             
             logger.debug(f"🎯 Predicted: {label} (confidence: {confidence:.2f})")
             
@@ -90,5 +161,37 @@ class GestureRecognizer:
             logger.error(f"❌ Prediction error: {e}")
             return "Error", 0.0
 
+    def predict_batch(self, features: np.ndarray):
+        """
+        Predict gestures for several hands with a single model call
+        
+        Args:
+            features: Feature matrix (N, D)
+            
+        Returns: list of N (label, confidence) tuples
+        """
+        if (self.model is None and self.session is None) or self.label_encoder is None:
+            logger.warning("⚠️ Model not loaded! Returning default.")
+            return [("Model Not Loaded", 0.0)] * len(features)
+
+        try:
+            features = np.asarray(features)
+            if features.ndim != 2 or features.shape[0] == 0:
+                logger.warning(f"⚠️ Expected (N, D) features, got {features.shape}")
+                return [("Invalid Input", 0.0)] * len(features)
+            
+            # One forward pass; labels derived from the probabilities
+            probabilities = self.predict_proba(features)
+            
+            prediction_idx = probabilities.argmax(axis=1)
+            confidences = probabilities[np.arange(len(prediction_idx)), prediction_idx]
+            labels = self.label_encoder.inverse_transform(prediction_idx)
+            
+            return [(label, float(conf)) for label, conf in zip(labels, confidences)]
+            
+        except Exception as e:
+            logger.error(f"❌ Batch prediction error: {e}")
+            return [("Error", 0.0)] * len(features)
+
 # Global instance
 gesture_recognizer = GestureRecognizer()
\ No newline at end of file
@@ -6,11 +6,52 @@ Hand Detection Service using MediaPipe Hands
 import cv2
 import mediapipe as mp
 import numpy as np
-from typing import Optional, List, Tuple
+from typing import Callable, Optional, List, Tuple
+from types import SimpleNamespace
+from pathlib import Path
+from contextlib import contextmanager
 import logging
+import os
+import queue
+import threading
+import time
+
+from mediapipe.framework.formats import landmark_pb2
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Optional MediaPipe Tasks HandLandmarker model (hand_landmarker.task).
+# When set, detection runs through the Tasks API instead of legacy Hands.
+HAND_LANDMARKER_ENV = "GRS_HAND_LANDMARKER"
+# Tasks API inference delegate: "cpu" (XNNPACK) or "gpu"
+HAND_DELEGATE_ENV = "GRS_HAND_DELEGATE"
+
+
+class _TasksResults:
+    """
+    Adapts a Tasks HandLandmarkerResult to the legacy solutions interface
+    (multi_hand_landmarks / multi_handedness) used across the app
+    """
+    
+    def __init__(self, result):
+        if result.hand_landmarks:
+            self.multi_hand_landmarks = [
+                SimpleNamespace(landmark=hand) for hand in result.hand_landmarks
+            ]
+            self.multi_handedness = [
+                SimpleNamespace(classification=[
+                    SimpleNamespace(label=c.category_name, score=c.score)
+                    for c in categories
+                ])
+                for categories in result.handedness
+            ]
+        else:
+            self.multi_hand_landmarks = None
+            self.multi_handedness = None
+
+
 class HandDetector:
     """
     Detects hands and extracts landmarks using MediaPipe Hands
@@ -21,7 +62,11 @@ class HandDetector:
         static_image_mode: bool = False,
         max_num_hands: int = 4,
         min_detection_confidence: float = 0.7,
-        min_tracking_confidence: float = 0.3
+        min_tracking_confidence: float = 0.3,
+        model_complexity: int = 0,
+        model_asset_path: Optional[str] = None,
+        delegate: Optional[str] = None,
+        result_callback: Optional[Callable[[any, int], None]] = None
     ):
         """
         Initialize MediaPipe Hands
@@ -31,47 +76,243 @@ class HandDetector:
             max_num_hands: Maximum number of hands to detect
             min_detection_confidence: Minimum confidence for detection
             min_tracking_confidence: Minimum confidence for tracking
+            model_complexity: Legacy Hands landmark model, 0 = lite (about
+                              2x faster on CPU, same 21 landmarks) or 1 = full
+                              (the Tasks API uses the .task model as given)
+            model_asset_path: hand_landmarker.task model for the Tasks API
+                              (defaults to $GRS_HAND_LANDMARKER). Falls back to
+                              legacy mp.solutions.hands when unset or missing
+            delegate: "cpu" or "gpu" inference for the Tasks API (defaults to
+                      $GRS_HAND_DELEGATE or "cpu"). GPU falls back to CPU
+                      if the delegate cannot be created
+            result_callback: Enables detect_async. Called as
+                             callback(results, timestamp_ms) for each frame;
+                             with the Tasks API this runs LIVE_STREAM mode
+                             and is called from MediaPipe's thread
         """
         self.mp_hands = mp.solutions.hands
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
         
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=max_num_hands,
-            min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=0.3,
-            model_complexity=0
-        )
+        self.max_num_hands = max_num_hands
+        
+        # Reused RGB buffer for MediaPipe input (reallocated on shape change)
+        self._rgb_buf = None
+        
+        # Reused landmark buffer filled by extract_landmarks_array
+        self._landmark_buf = np.empty((max_num_hands, 21, 3), dtype=np.float32)
+        
+        self.hands = None
+        self.landmarker = None
+        self._video_mode = not static_image_mode
+        self._last_timestamp_ms = -1
+        self._result_callback = result_callback
+        self._live_stream = result_callback is not None and not static_image_mode
+        
+        model_asset_path = model_asset_path or os.environ.get(HAND_LANDMARKER_ENV)
+        delegate = (delegate or os.environ.get(HAND_DELEGATE_ENV, "cpu")).lower()
+        if model_asset_path and Path(model_asset_path).exists():
+            # Kept for reset(), which recreates the landmarker
+            self._landmarker_args = (
+                model_asset_path,
+                delegate,
+                static_image_mode,
+                max_num_hands,
+                min_detection_confidence,
+                min_tracking_confidence
+            )
+            try:
+                self.landmarker = self._create_landmarker(*self._landmarker_args)
+            except Exception as e:
+                logger.warning(f"⚠️ HandLandmarker failed to load ({e}), "
+                               f"using legacy MediaPipe Hands")
+        elif model_asset_path:
+            logger.warning(f"⚠️ HandLandmarker model not found: {model_asset_path}, "
+                           f"using legacy MediaPipe Hands")
+        
+        # Settings that affect detection results (e.g. part of the
+        # FeatureCache key)
+        self.config = {
+            'backend': 'tasks' if self.landmarker else 'solutions',
+            'model_asset_path': str(model_asset_path) if self.landmarker else None,
+            'static_image_mode': static_image_mode,
+            'max_num_hands': max_num_hands,
+            'min_detection_confidence': min_detection_confidence,
+            'model_complexity': None if self.landmarker else model_complexity,
+        }
+        
+        if self.landmarker is None:
+            self.hands = self.mp_hands.Hands(
+                static_image_mode=static_image_mode,
+                max_num_hands=max_num_hands,
+                min_detection_confidence=min_detection_confidence,
+                min_tracking_confidence=min_tracking_confidence,
+                model_complexity=model_complexity
+            )
 
         
         logger.info(f"HandDetector initialized: max_hands={max_num_hands}, "
                    f"detection_conf={min_detection_confidence}, "
-                   f"tracking_conf={min_tracking_confidence}")
+                   f"tracking_conf={min_tracking_confidence}, "
+                   f"backend={'tasks' if self.landmarker else 'solutions'}")
+    
+    def _create_landmarker(
+        self,
+        model_asset_path: str,
+        delegate: str,
+        static_image_mode: bool,
+        max_num_hands: int,
+        min_detection_confidence: float,
+        min_tracking_confidence: float
+    ):
+        """
+        Create a Tasks API HandLandmarker
+        
+        In VIDEO mode the landmarker tracks hands from the previous frame's
+        landmarks and only re-runs palm detection when tracking is lost.
+        LIVE_STREAM (with a result_callback) tracks the same way, but
+        detect_async returns immediately and results arrive on the callback.
+        """
+        vision = mp.tasks.vision
+        Delegate = mp.tasks.BaseOptions.Delegate
+        if static_image_mode:
+            running_mode = vision.RunningMode.IMAGE
+        elif self._live_stream:
+            running_mode = vision.RunningMode.LIVE_STREAM
+        else:
+            running_mode = vision.RunningMode.VIDEO
+        
+        def make_options(mp_delegate):
+            options = vision.HandLandmarkerOptions(
+                base_options=mp.tasks.BaseOptions(
+                    model_asset_path=str(model_asset_path),
+                    delegate=mp_delegate
+                ),
+                running_mode=running_mode,
+                num_hands=max_num_hands,
+                min_hand_detection_confidence=min_detection_confidence,
+                min_tracking_confidence=min_tracking_confidence
+            )
+            if self._live_stream:
+                options.result_callback = self._on_live_result
+            return options
+        
+        landmarker = None
+        if delegate == "gpu":
+            try:
+                landmarker = vision.HandLandmarker.create_from_options(make_options(Delegate.GPU))
+            except Exception as e:
+                logger.warning(f"⚠️ GPU delegate unavailable ({e}), falling back to CPU")
+                delegate = "cpu"
+        elif delegate != "cpu":
+            logger.warning(f"⚠️ Unknown delegate '{delegate}', using CPU")
+            delegate = "cpu"
+        
+        if landmarker is None:
+            landmarker = vision.HandLandmarker.create_from_options(make_options(Delegate.CPU))
+        
+        logger.info(f"✅ HandLandmarker loaded: {model_asset_path} "
+                    f"({running_mode.name}, {delegate.upper()})")
+        return landmarker
+    
+    def _next_timestamp_ms(self) -> int:
+        """Monotonic, strictly increasing timestamp for detect_for_video"""
+        timestamp_ms = int(time.monotonic() * 1000)
+        if timestamp_ms <= self._last_timestamp_ms:
+            timestamp_ms = self._last_timestamp_ms + 1
+        self._last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+    
+    def _process(self, image_rgb: np.ndarray):
+        """Run the active MediaPipe backend on an RGB image"""
+        if self.landmarker is None:
+            return self.hands.process(image_rgb)
+        
+        if self._live_stream:
+            raise RuntimeError("HandDetector is in LIVE_STREAM mode, use detect_async")
+        
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb)
+        if self._video_mode:
+            result = self.landmarker.detect_for_video(mp_image, self._next_timestamp_ms())
+        else:
+            result = self.landmarker.detect(mp_image)
+        
+        return _TasksResults(result)
+    
+    def _on_live_result(self, result, output_image, timestamp_ms: int):
+        """LIVE_STREAM callback: adapt the result and pass it on"""
+        self._result_callback(_TasksResults(result), timestamp_ms)
+    
+    def _to_rgb(self, image: np.ndarray) -> np.ndarray:
+        """BGR -> RGB (MediaPipe expects RGB) into the reused buffer"""
+        if self._rgb_buf is None or self._rgb_buf.shape != image.shape:
+            self._rgb_buf = np.empty_like(image)
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
     
-    def detect_hands(self, image: np.ndarray) -> Tuple[np.ndarray, Optional[any]]:
+    def detect_async(self, image: np.ndarray, input_is_rgb: bool = False) -> int:
+        """
+        Submit a frame for detection, result via result_callback
+        
+        With the Tasks API in LIVE_STREAM mode this returns at once and
+        MediaPipe pipelines the frames internally (dropping frames while
+        it is busy). The legacy backend detects synchronously and calls
+        the callback before returning.
+        
+        Args:
+            image: Input image (BGR format from OpenCV)
+            input_is_rgb: See detect_hands
+            
+        Returns:
+            Frame timestamp (ms), also passed to the callback
+        """
+        if self._result_callback is None:
+            raise RuntimeError("detect_async needs a HandDetector created with result_callback")
+        
+        image_rgb = image if input_is_rgb else self._to_rgb(image)
+        timestamp_ms = self._next_timestamp_ms()
+        
+        if self._live_stream and self.landmarker is not None:
+            # mp.Image copies the pixels, so the RGB buffer can be reused
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb)
+            self.landmarker.detect_async(mp_image, timestamp_ms)
+        else:
+            _, results = self.detect_hands(image_rgb, input_is_rgb=True)
+            self._result_callback(results, timestamp_ms)
+        
+        return timestamp_ms
+    
+    def detect_hands(
+        self,
+        image: np.ndarray,
+        input_is_rgb: bool = False
+    ) -> Tuple[np.ndarray, Optional[any]]:
         """
         Detect hands in image
         
         Args:
             image: Input image (BGR format from OpenCV)
+            input_is_rgb: Set when the source already delivers RGB frames
+                          (e.g. a decoder writing RGB24); the BGR->RGB
+                          conversion is skipped and image is used as is
             
         Returns:
             Tuple of (processed_image, results)
-            - processed_image: Image in RGB format
+            - processed_image: Image in RGB format. Unless input_is_rgb, this
+              is a buffer reused across calls - copy it if it must outlive
+              the next call
             - results: MediaPipe results object or None
         """
-        # Convert BGR to RGB (MediaPipe expects RGB)
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        image_rgb = image if input_is_rgb else self._to_rgb(image)
         
         # To improve performance, mark image as not writeable
+        was_writeable = image_rgb.flags.writeable
         image_rgb.flags.writeable = False
         
         # Process image
-        results = self.hands.process(image_rgb)
+        results = self._process(image_rgb)
         
-        # Mark image as writeable again
-        image_rgb.flags.writeable = True
+        # Restore writeable flag
+        image_rgb.flags.writeable = was_writeable
         
         return image_rgb, results
     
@@ -85,28 +326,51 @@ class HandDetector:
         Returns:
             List of hands, each hand is a list of 21 landmark dicts
             Each landmark dict: {'x': float, 'y': float, 'z': float}
+            
+        Note: reuses the extract_landmarks_array buffer, so an array
+        returned earlier for the same detector is overwritten
+        """
+        # Single protobuf pass (into the landmark buffer), dicts built from floats
+        points = self.extract_landmarks_array(results)
+        return [
+            [{'x': x, 'y': y, 'z': z} for x, y, z in hand]
+            for hand in points.tolist()
+        ]
+    
+    def extract_landmarks_array(self, results: any) -> np.ndarray:
+        """
+        Extract hand landmarks as an array for the feature pipeline
+        
+        Reads the protobuf landmarks straight into a buffer kept on the
+        detector; no per-landmark dicts are built. The returned array is a
+        view of that buffer and is overwritten by the next call - copy it
+        if it must be kept.
+        
+        Args:
+            results: MediaPipe results object
+            
+        Returns:
+            Landmark array (num_hands, 21, 3), empty (0, 21, 3) if no hands
         """
         if not results.multi_hand_landmarks:
-            return []
+            return self._landmark_buf[:0]
         
-        all_hands = []
-        for hand_landmarks in results.multi_hand_landmarks:
-            landmarks = []
-            for landmark in hand_landmarks.landmark:
-                landmarks.append({
-                    'x': landmark.x,
-                    'y': landmark.y,
-                    'z': landmark.z
-                })
-            all_hands.append(landmarks)
+        buf = self._landmark_buf
+        num_hands = 0
+        for i, hand_landmarks in enumerate(results.multi_hand_landmarks[:len(buf)]):
+            # One row assignment per hand instead of 63 scalar stores
+            buf[i] = [(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark]
+            num_hands = i + 1
         
-        return all_hands
+        return buf[:num_hands]
     
     def draw_landmarks(
         self,
         image: np.ndarray,
         results: any,
-        draw_connections: bool = True
+        draw_connections: bool = True,
+        frame: Optional[np.ndarray] = None,
+        out: Optional[np.ndarray] = None
     ) -> np.ndarray:
         """
         Draw hand landmarks on image
@@ -115,17 +379,27 @@ class HandDetector:
             image: Input image (RGB format)
             results: MediaPipe results object
             draw_connections: Whether to draw connections between landmarks
+            frame: Original BGR frame. If given, landmarks are drawn on it in
+                   place and no RGB->BGR conversion is done
+            out: Buffer for the BGR copy (e.g. the image returned for the
+                 previous frame), reused instead of allocating a new image
+                 each frame. Ignored when frame is given
             
         Returns:
-            Image with drawn landmarks
+            Image with drawn landmarks (BGR)
         """
-        if not results.multi_hand_landmarks:
-            return image
+        if frame is not None:
+            image_bgr = frame
+        else:
+            # Convert back to BGR for OpenCV
+            image_bgr = cv2.cvtColor(image, cv2.COLOR_RGB2BGR, dst=out)
         
-        # Convert back to BGR for OpenCV
-        image_bgr = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        if not results.multi_hand_landmarks:
+            return image_bgr
         
         for hand_landmarks in results.multi_hand_landmarks:
+            hand_landmarks = self._as_landmark_proto(hand_landmarks)
+            
             if draw_connections:
                 # Draw landmarks and connections
                 self.mp_drawing.draw_landmarks(
@@ -145,6 +419,18 @@ class HandDetector:
         
         return image_bgr
     
+    def _as_landmark_proto(self, hand_landmarks: any):
+        """Convert Tasks landmarks to the protobuf drawing_utils expects"""
+        if isinstance(hand_landmarks, landmark_pb2.NormalizedLandmarkList):
+            return hand_landmarks
+        
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        landmark_list.landmark.extend([
+            landmark_pb2.NormalizedLandmark(x=lm.x, y=lm.y, z=lm.z)
+            for lm in hand_landmarks.landmark
+        ])
+        return landmark_list
+    
     def get_hand_info(self, results: any) -> List[dict]:
         """
         Get detailed hand information
@@ -182,10 +468,120 @@ class HandDetector:
         return hands_info
 
     
+    def reset(self):
+        """
+        Drop tracking state, so the next frame is detected from scratch
+        
+        Needed before a detector moves to another stream: in tracking mode
+        it would otherwise follow a hand ROI from the previous stream.
+        """
+        if self.landmarker is not None:
+            # The Tasks API has no reset; VIDEO / LIVE_STREAM timestamps
+            # must also restart, so build a new landmarker
+            self.landmarker.close()
+            self.landmarker = self._create_landmarker(*self._landmarker_args)
+            self._last_timestamp_ms = -1
+        else:
+            self.hands.reset()
+    
     def cleanup(self):
         """Release MediaPipe resources"""
-        self.hands.close()
+        if self.landmarker is not None:
+            self.landmarker.close()
+        else:
+            self.hands.close()
         logger.info("HandDetector cleaned up")
 
-# Global instance
-hand_detector = HandDetector()
+class HandDetectorPool:
+    """
+    Pool of HandDetector instances, one per concurrent worker
+    
+    A MediaPipe graph processes one frame at a time, so a single shared
+    detector serializes all cameras. Detectors are created lazily up to
+    `size`. A worker holds one for its whole stream (e.g. a WebSocket
+    connection), so tracking state always comes from that stream's own
+    frames; detectors are reset when they go back to the pool.
+    """
+    
+    def __init__(self, size: int, **detector_kwargs):
+        """
+        Initialize pool
+        
+        Args:
+            size: Maximum number of detectors
+            **detector_kwargs: Passed to each HandDetector
+        """
+        self.size = max(1, size)
+        self.detector_kwargs = detector_kwargs
+        self._available = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        
+        logger.info(f"HandDetectorPool initialized: size={self.size}")
+    
+    def get(self, timeout: Optional[float] = None) -> HandDetector:
+        """
+        Take a detector from the pool (blocks while all are in use)
+        
+        Args:
+            timeout: Seconds to wait for a free detector (None = forever)
+            
+        Returns:
+            HandDetector - give it back with release()
+        """
+        try:
+            return self._available.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        
+        if create:
+            try:
+                return HandDetector(**self.detector_kwargs)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        
+        return self._available.get(timeout=timeout)
+    
+    def release(self, detector: HandDetector):
+        """Return a detector to the pool (tracking state is reset)"""
+        try:
+            detector.reset()
+        except Exception as e:
+            # Unusable detector: drop it, a new one is created on demand
+            logger.warning(f"⚠️ HandDetector reset failed ({e}), discarding it")
+            with self._lock:
+                self._created -= 1
+            return
+        self._available.put(detector)
+    
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None):
+        """Context manager around get()/release()"""
+        detector = self.get(timeout)
+        try:
+            yield detector
+        finally:
+            self.release(detector)
+    
+    def cleanup(self):
+        """Release idle detectors"""
+        while True:
+            try:
+                detector = self._available.get_nowait()
+            except queue.Empty:
+                break
+            detector.cleanup()
+            with self._lock:
+                self._created -= 1
+
+
+# Global pool: one detector per camera stream plus one for data
+# collection (created only when needed)
+hand_detector_pool = HandDetectorPool(size=settings.MAX_CAMERAS + 1)
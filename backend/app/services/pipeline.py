@@ -0,0 +1,203 @@
+"""
+Frame Pipeline Service
+Camera capture and hand detection on worker threads for live loops
+"""
+import queue
+import threading
+import logging
+from typing import List, NamedTuple, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Static-scene gate defaults: a frame whose 16x16 grayscale thumbnail
+# differs from the last detected one by less than STATIC_DIFF_THRESHOLD
+# (mean abs, 0-255) reuses that detection, at most STATIC_MAX_REUSE
+# frames in a row
+STATIC_DIFF_THRESHOLD = 1.5
+STATIC_MAX_REUSE = 15
+
+
+class FrameResult(NamedTuple):
+    """One processed frame, handed from the detection thread to the consumer"""
+    frame: np.ndarray                 # BGR frame (owned by the consumer, may be drawn on)
+    results: any                      # MediaPipe results object
+    hands_info: List[dict]            # HandDetector.get_hand_info
+    landmarks: List[List[dict]]       # HandDetector.extract_landmarks
+    features: List[np.ndarray]        # One feature vector per hand (if a processor is set)
+
+
+def put_latest(q: queue.Queue, item):
+    """Put without blocking; when the queue is full the oldest item is dropped"""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+
+def scene_thumbnail(frame: np.ndarray, size=(16, 16)) -> np.ndarray:
+    """Small grayscale copy of a BGR frame for cheap scene-change checks"""
+    return cv2.cvtColor(
+        cv2.resize(frame, size, interpolation=cv2.INTER_AREA),
+        cv2.COLOR_BGR2GRAY
+    )
+
+
+class FramePipeline:
+    """
+    capture thread -> detection thread -> consumer (caller's thread)
+
+    Stages overlap, so throughput follows the slowest stage instead of
+    the sum of all of them. Bounded queues drop the oldest item when a
+    stage falls behind, keeping latency low. The consumer stays on the
+    caller's thread, since HighGUI (cv2.imshow / waitKey) must run on
+    the main thread.
+    """
+
+    def __init__(
+        self,
+        camera_manager,
+        hand_detector,
+        feature_processor=None,
+        camera_id: int = 0,
+        queue_size: int = 2,
+        idle_detect_interval: int = 1,
+        static_diff_threshold: float = 0.0,
+        static_max_reuse: int = STATIC_MAX_REUSE
+    ):
+        """
+        Initialize pipeline
+
+        Args:
+            camera_manager: CameraManager with camera_id added
+            hand_detector: HandDetector, used only by the detection thread
+            feature_processor: FeatureProcessor for per-hand features (optional)
+            camera_id: Camera to read
+            queue_size: Capacity of each stage queue
+            idle_detect_interval: While no hand is seen, run detection only
+                                  on every Nth frame (the frames between are
+                                  passed through as hand-less). With a hand in
+                                  view every frame is tracked
+            static_diff_threshold: Reuse the last detection while the frame's
+                                   16x16 grayscale thumbnail differs from the
+                                   last detected one by less than this (mean
+                                   abs, 0-255). 0 disables the check,
+                                   STATIC_DIFF_THRESHOLD is a good value
+            static_max_reuse: Detect at least every this many frames even in
+                              a static scene
+        """
+        self.camera_manager = camera_manager
+        self.hand_detector = hand_detector
+        self.feature_processor = feature_processor
+        self.camera_id = camera_id
+        self.idle_detect_interval = max(1, idle_detect_interval)
+        self.static_diff_threshold = static_diff_threshold
+        self.static_max_reuse = static_max_reuse
+
+        self._frames = queue.Queue(maxsize=queue_size)
+        self._results = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        """False once stopped or the camera ran out of frames"""
+        return bool(self._threads) and not self._stop.is_set()
+
+    def start(self):
+        """Start the capture and detection threads"""
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_worker, name="pipeline-capture", daemon=True),
+            threading.Thread(target=self._detect_worker, name="pipeline-detect", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"FramePipeline started (camera {self.camera_id})")
+
+    def stop(self):
+        """Stop the threads (camera and detector are left to the caller)"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        logger.info("FramePipeline stopped")
+
+    def get(self, timeout: float = 0.1) -> Optional[FrameResult]:
+        """Next processed frame, or None if none arrived within timeout"""
+        try:
+            return self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _capture_worker(self):
+        """Capture stage: newest camera frames into the frame queue"""
+        while not self._stop.is_set():
+            frame = self.camera_manager.get_frame(self.camera_id)
+            if frame is None:
+                logger.warning("❌ Failed to get frame, stopping pipeline")
+                self._stop.set()
+                break
+            put_latest(self._frames, frame)
+
+    def _detect_worker(self):
+        """Detection stage: landmarks (+ features) per frame into the result queue"""
+        frame_idx = 0
+        idle_results = None  # Last results, if they had no hand
+        last_result = None   # Last detected FrameResult (static-scene gate)
+        key_thumb = None     # Its scene thumbnail
+        reused = 0
+
+        while not self._stop.is_set():
+            try:
+                frame = self._frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            frame_idx += 1
+            if idle_results is not None and frame_idx % self.idle_detect_interval:
+                put_latest(self._results, FrameResult(frame, idle_results, [], [], []))
+                continue
+
+            if self.static_diff_threshold > 0:
+                thumb = scene_thumbnail(frame)
+                if (
+                    last_result is not None
+                    and reused < self.static_max_reuse
+                    and cv2.absdiff(key_thumb, thumb).mean() < self.static_diff_threshold
+                ):
+                    # Scene unchanged: pass the frame on with the last detection
+                    reused += 1
+                    put_latest(self._results, last_result._replace(frame=frame))
+                    continue
+                key_thumb = thumb
+                reused = 0
+
+            _, results = self.hand_detector.detect_hands(frame)
+            hands_info = self.hand_detector.get_hand_info(results)
+            landmarks = self.hand_detector.extract_landmarks(results)
+            idle_results = None if landmarks else results
+
+            features = []
+            if self.feature_processor is not None and landmarks:
+                try:
+                    # All hands in one vectorized pass, one row per hand
+                    features = list(self.feature_processor.extract_features_batch(landmarks))
+                except Exception as e:
+                    logger.warning(f"⚠️ Feature extraction error: {e}")
+
+            last_result = FrameResult(frame, results, hands_info, landmarks, features)
+            put_latest(self._results, last_result)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -1,4 +1,5 @@
 import psutil
+import aiohttp
 import logging
 import asyncio
 import os
@@ -27,13 +28,32 @@ class SystemManager:
         self.operation_progress = 0.0
         self.operation_message = ""
         self.start_time = datetime.utcnow()
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # Prime the CPU counter; later non-blocking calls measure since the last one
+        psutil.cpu_percent(interval=None)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Shared HTTP session for health pings (created on first use)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=4, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=2)
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     async def check_health(self) -> Dict:
         """Check system health"""
         try:
             self.current_status = SystemStatusEnum.CHECKING
             
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory = psutil.virtual_memory()
             memory_percent = memory.percent
             
@@ -41,12 +61,11 @@ class SystemManager:
             uptime_seconds = int(uptime.total_seconds())
             
             try:
-                import aiohttp
-                async with aiohttp.ClientSession() as session:
-                    async with session.get('http://localhost:8000/health', timeout=aiohttp.ClientTimeout(total=2)):
-                        pass
+                session = await self._get_session()
+                async with session.get('http://localhost:8000/health'):
+                    pass
                 backend_ok = True
-            except:
+            except (aiohttp.ClientError, asyncio.TimeoutError):
                 backend_ok = False
             
             if backend_ok:
@@ -73,12 +92,20 @@ class SystemManager:
                 "timestamp": datetime.utcnow().isoformat()
             }
 
+    def _set_progress(self, message: str, progress: float):
+        """Publish operation progress (polled via get_operation_progress)"""
+        self.operation_message = message
+        self.operation_progress = progress
+        logger.info(f"  {message}")
+
     async def shutdown_system(self) -> Dict:
         """Graceful shutdown"""
         if self.operation_in_progress:
             return {"error": "Operation already in progress"}
         
         try:
+            from app.services.camera_manager import camera_manager
+            
             self.operation_in_progress = True
             self.current_operation = "shutdown"
             self.operation_message = "Preparing system shutdown..."
@@ -86,24 +113,18 @@ class SystemManager:
             
             logger.info("SHUTTING DOWN SYSTEM...")
             
-            steps = [
-                ("Closing cameras...", 0.2),
-                ("Saving data...", 0.4),
-                ("Stopping services...", 0.6),
-                ("Cleaning up...", 0.8),
-                ("Goodbye!", 1.0)
-            ]
+            # Progress follows the actual teardown steps
+            self._set_progress("Closing cameras...", 0.2)
+            await asyncio.to_thread(camera_manager.cleanup)
             
-            for message, progress in steps:
-                self.operation_message = message
-                self.operation_progress = progress
-                logger.info(f"  {message}")
-                await asyncio.sleep(0.5)
+            self._set_progress("Closing connections...", 0.6)
+            await self.close()
             
+            self._set_progress("Goodbye!", 1.0)
             logger.info("System shutdown initiated")
             
-            await asyncio.sleep(1)
-            os.kill(os.getpid(), signal.SIGTERM)
+            # Signal after this response has been sent
+            asyncio.get_running_loop().call_later(0.5, os.kill, os.getpid(), signal.SIGTERM)
             
             return {
                 "status": "success",
@@ -124,6 +145,9 @@ class SystemManager:
             return {"error": "Operation already in progress"}
         
         try:
+            from app.services.camera_manager import camera_manager
+            from app.services.gesture_recognizer import gesture_recognizer
+            
             self.operation_in_progress = True
             self.current_operation = "restart"
             self.operation_message = "Preparing system restart..."
@@ -131,22 +155,47 @@ class SystemManager:
             
             logger.info("RESTARTING SYSTEM...")
             
-            steps = [
-                ("Closing cameras...", 0.15),
-                ("Saving data...", 0.30),
-                ("Stopping services...", 0.45),
-                ("Shutting down backend...", 0.60),
-                ("Starting backend...", 0.75),
-                ("Initializing services...", 0.90),
-                ("Ready!", 1.0)
-            ]
-            
-            for message, progress in steps:
-                self.operation_message = message
-                self.operation_progress = progress
-                logger.info(f"  {message}")
-                await asyncio.sleep(0.5)
+            # Remember cameras (config + image settings) so they can be
+            # reopened as they were
+            saved_cameras = {
+                camera_id: (
+                    dict(config),
+                    dict(camera_manager.camera_settings.get(camera_id, {}))
+                )
+                for camera_id, config in camera_manager.camera_configs.items()
+            }
             
+            # Progress follows the actual restart steps
+            self._set_progress("Closing cameras...", 0.2)
+            await asyncio.to_thread(camera_manager.cleanup)
+            
+            self._set_progress("Reloading model...", 0.4)
+            await asyncio.to_thread(gesture_recognizer.load_model)
+            
+            self._set_progress("Starting cameras...", 0.7)
+            for camera_id, (config, settings) in saved_cameras.items():
+                added = await asyncio.to_thread(
+                    camera_manager.add_camera,
+                    camera_id,
+                    config['source'],
+                    config['type'],
+                    resolution=tuple(config['resolution']),
+                    fps=config['fps'] or 30,  # Some backends report 0
+                    fourcc=config.get('fourcc')
+                )
+                if not added:
+                    logger.warning(f"⚠️ Camera {camera_id} could not be reopened")
+                    continue
+                
+                camera_manager.camera_configs[camera_id]['name'] = config['name']
+                
+                # Re-apply only what was changed from the fresh defaults
+                defaults = camera_manager.camera_settings.get(camera_id, {})
+                changed = {k: v for k, v in settings.items() if defaults.get(k) != v}
+                if changed:
+                    await asyncio.to_thread(camera_manager.update_settings, camera_id, changed)
+            
+            self._set_progress("Ready!", 1.0)
             logger.info("System restart completed")
             
             self.operation_in_progress = False
@@ -6,10 +6,14 @@ import numpy as np
 from pathlib import Path
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Frames to ignore SPACE after a capture (~0.2 s at 30 FPS)
+DEBOUNCE_FRAMES = 6
+
 class DataCollector:
     """
     Collects training data from camera
@@ -24,6 +28,10 @@ class DataCollector:
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # JPEG encoding + disk writes run off the preview loop
+        self._writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="collector-writer")
+        
         logger.info(f"DataCollector initialized: {self.output_dir}")
     
     def collect_gesture_data(
@@ -46,6 +54,10 @@ class DataCollector:
         
         collected = 0
         skipped = 0
+        frame_index = 0
+        last_capture_frame = -DEBOUNCE_FRAMES
+        pending_writes = []
+        output_image = None  # Preview buffer, reused across frames
         
         try:
             while collected < num_samples:
@@ -56,10 +68,11 @@ class DataCollector:
                 
                 # Detect hands
                 image_rgb, results = hand_detector.detect_hands(frame)
-                landmarks = hand_detector.extract_landmarks(results)
+                landmarks = hand_detector.extract_landmarks_array(results)
+                frame_index += 1
                 
-                # Draw
-                output_image = hand_detector.draw_landmarks(image_rgb, results)
+                # Draw (on a copy: the clean frame is what gets saved)
+                output_image = hand_detector.draw_landmarks(image_rgb, results, out=output_image)
                 
                 # Status overlay
                 progress = f"{collected}/{num_samples}"
@@ -70,7 +83,7 @@ class DataCollector:
                 cv2.putText(output_image, "Press SPACE to capture", (10, 110),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
                 
-                if landmarks:
+                if len(landmarks):
                     cv2.putText(output_image, "Hand detected!", (10, 150),
                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
                 else:
@@ -81,19 +94,21 @@ class DataCollector:
                 
                 key = cv2.waitKey(1) & 0xFF
                 
-                # Capture on SPACE
-                if key == ord(' '):
-                    if landmarks:
-                        # Save image
+                # Capture on SPACE (debounced by frame count, the preview never blocks)
+                if key == ord(' ') and frame_index - last_capture_frame >= DEBOUNCE_FRAMES:
+                    if len(landmarks):
+                        # Save image in the background (copy: the camera may reuse the buffer)
                         timestamp = int(time.time() * 1000)
                         filename = f"{gesture_name}_{timestamp}_{collected}.jpg"
                         filepath = gesture_dir / filename
                         
-                        cv2.imwrite(str(filepath), frame)
+                        pending_writes.append(
+                            self._writer.submit(cv2.imwrite, str(filepath), frame.copy())
+                        )
                         collected += 1
+                        last_capture_frame = frame_index
                         
                         print(f"✅ Captured {collected}/{num_samples}")
-                        time.sleep(0.2)  # Debounce
                     else:
                         skipped += 1
                         print(f"⚠️  No hand detected, skipped")
@@ -108,6 +123,13 @@ class DataCollector:
         
         finally:
             cv2.destroyAllWindows()
+            
+            # Make sure every captured image is on disk before reporting
+            wait(pending_writes)
+            failed = sum(1 for f in pending_writes if f.exception() or not f.result())
+            if failed:
+                logger.error(f"❌ {failed} captured images failed to save")
+                collected -= failed
         
         # Statistics
         stats = {
@@ -1,12 +1,48 @@
 import requests
 import zipfile
+import tempfile
+import queue
 import os
 from pathlib import Path
 import logging
 from tqdm import tqdm
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 logger = logging.getLogger(__name__)
 
+# Archives up to this size stay in memory; larger ones spill to a temp file
+SPOOL_MAX_SIZE = 256 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MB
+DOWNLOAD_WORKERS = 4
+REQUEST_TIMEOUT = (10, 60)  # connect, read (seconds)
+MAX_RESUMES = 5
+
+IMAGE_EXTENSIONS = ('.jpg', '.png')
+
+
+def _count_images(root: Path) -> int:
+    """
+    Count image files under root with a single os.scandir walk
+    
+    Args:
+        root: Directory to scan recursively
+        
+    Returns:
+        Number of .jpg/.png files
+    """
+    count = 0
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(IMAGE_EXTENSIONS):
+                    count += 1
+    return count
+
 class HaGRIDDownloader:
     
     # Subset URLs (using sample version for quick start)
@@ -31,17 +67,20 @@ class HaGRIDDownloader:
         'two_up_inverted': 'https://github.com/hukenovs/hagrid/releases/download/v1.0/two_up_inverted.zip',
     }
     
-    # Map HaGRID gestures to our gesture names
-    GESTURE_MAPPING = {
-        'fist': 'fist',
-        'palm': 'open_hand',
-        'one': 'one_finger',
-        'two_up': 'two_fingers',
-        'three': 'three_fingers',
-        'four': 'four_fingers',
-        'palm': 'five_fingers',  # Open palm = 5 fingers
-        'ok': 'ok_sign',
-    }
+    # Map HaGRID gestures to our gesture names (one HaGRID source per label).
+    # Kept as pairs so a repeated source can't silently overwrite another
+    # entry the way a duplicate dict key does. 'open_hand' has no HaGRID
+    # source: HaGRID 'palm' is used for 'five_fingers'.
+    GESTURE_SOURCES = (
+        ('fist', 'fist'),
+        ('one', 'one_finger'),
+        ('two_up', 'two_fingers'),
+        ('three', 'three_fingers'),
+        ('four', 'four_fingers'),
+        ('palm', 'five_fingers'),  # Open palm = 5 fingers
+        ('ok', 'ok_sign'),
+    )
+    GESTURE_MAPPING = dict(GESTURE_SOURCES)
     
     def __init__(self, data_dir: str = './data/hagrid'):
         """
@@ -52,14 +91,88 @@ class HaGRIDDownloader:
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Retry failed connections / gateway errors with exponential backoff
+        retry = Retry(total=5, backoff_factor=1, status_forcelist=[502, 503, 504])
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(max_retries=retry))
+        self.session.mount('http://', HTTPAdapter(max_retries=retry))
+        
         logger.info(f"HaGRID Downloader initialized: {self.data_dir}")
     
-    def download_gesture(self, gesture_name: str) -> bool:
+    def _download_to(self, url: str, buf, desc: str, position: int = 0):
+        """
+        Stream url into buf, resuming with a Range request if the transfer drops
+        
+        The resume carries If-Range (ETag / Last-Modified), so if the file
+        changed on the server it is sent in full and the download restarts.
+        
+        Args:
+            url: Archive URL
+            buf: Writable binary file object
+            desc: Progress bar label
+            position: tqdm bar line
+            
+        Raises:
+            IOError: If the received size doesn't match Content-Length
+        """
+        response = self.session.get(url, stream=True, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        
+        total_size = int(response.headers.get('content-length', 0))
+        validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+        resumes = 0
+        
+        with tqdm(
+            total=total_size,
+            unit='B',
+            unit_scale=True,
+            desc=desc,
+            position=position,
+            mininterval=0.5
+        ) as pbar:
+            while True:
+                try:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        buf.write(chunk)
+                        pbar.update(len(chunk))
+                    break
+                except (requests.exceptions.ChunkedEncodingError,
+                        requests.exceptions.ConnectionError) as e:
+                    resumes += 1
+                    if resumes > MAX_RESUMES:
+                        raise
+                    
+                    received = buf.tell()
+                    logger.warning(f"⚠️  {desc}: transfer dropped at {received} bytes ({e}), "
+                                   f"resuming ({resumes}/{MAX_RESUMES})")
+                    
+                    headers = {'Range': f'bytes={received}-'}
+                    if validator:
+                        headers['If-Range'] = validator
+                    response = self.session.get(
+                        url, stream=True, headers=headers, timeout=REQUEST_TIMEOUT
+                    )
+                    response.raise_for_status()
+                    
+                    if response.status_code != 206:
+                        # Range ignored or file changed: start over
+                        buf.seek(0)
+                        buf.truncate()
+                        total_size = int(response.headers.get('content-length', 0))
+                        pbar.reset(total=total_size)
+        
+        received = buf.tell()
+        if total_size and received != total_size:
+            raise IOError(f"incomplete download: {received}/{total_size} bytes")
+    
+    def download_gesture(self, gesture_name: str, position: int = 0) -> bool:
         """
         Download a specific gesture dataset
         
         Args:
             gesture_name: Name of gesture to download
+            position: tqdm bar line (for concurrent downloads)
             
         Returns:
             True if successful
@@ -69,7 +182,6 @@ class HaGRIDDownloader:
             return False
         
         url = self.DATASET_URLS[gesture_name]
-        zip_path = self.data_dir / f"{gesture_name}.zip"
         extract_path = self.data_dir / gesture_name
         
         # Check if already downloaded
@@ -80,29 +192,16 @@ class HaGRIDDownloader:
         try:
             logger.info(f"⬇️  Downloading {gesture_name}...")
             
-            # Download with progress bar
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
-            
-            total_size = int(response.headers.get('content-length', 0))
-            
-            with open(zip_path, 'wb') as f, tqdm(
-                total=total_size,
-                unit='B',
-                unit_scale=True,
-                desc=gesture_name
-            ) as pbar:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-                    pbar.update(len(chunk))
-            
-            # Extract
-            logger.info(f"📦 Extracting {gesture_name}...")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_path)
-            
-            # Remove zip file to save space
-            zip_path.unlink()
+            # Spool the archive instead of writing a zip to disk and reading it back
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as buf:
+                # Download with progress bar
+                self._download_to(url, buf, gesture_name, position)
+                
+                # Extract
+                logger.info(f"📦 Extracting {gesture_name}...")
+                buf.seek(0)
+                with zipfile.ZipFile(buf, 'r') as zip_ref:
+                    zip_ref.extractall(extract_path)
             
             logger.info(f"✅ {gesture_name} downloaded and extracted")
             return True
@@ -118,16 +217,8 @@ class HaGRIDDownloader:
         Returns:
             Dict with download status for each gesture
         """
-        # Gestures we need
-        gestures_to_download = [
-            'fist',
-            'palm',
-            'one',
-            'two_up',
-            'three',
-            'four',
-            'ok'
-        ]
+        # Gestures we need: only sources referenced by GESTURE_MAPPING
+        gestures_to_download = list(self.GESTURE_MAPPING)
         
         results = {}
         
@@ -137,9 +228,25 @@ class HaGRIDDownloader:
         print(f"\nGestures to download: {len(gestures_to_download)}")
         print("This may take 5-10 minutes depending on connection...\n")
         
-        for gesture in gestures_to_download:
-            success = self.download_gesture(gesture)
-            results[gesture] = success
+        # Network-bound: run downloads concurrently, one progress line per worker
+        bar_slots = queue.Queue()
+        for slot in range(DOWNLOAD_WORKERS):
+            bar_slots.put(slot)
+        
+        def download(gesture: str) -> bool:
+            slot = bar_slots.get()
+            try:
+                return self.download_gesture(gesture, position=slot)
+            finally:
+                bar_slots.put(slot)
+        
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+            futures = {pool.submit(download, g): g for g in gestures_to_download}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        
+        # Keep summary in request order
+        results = {g: results[g] for g in gestures_to_download}
         
         # Summary
         successful = sum(results.values())
@@ -163,13 +270,11 @@ class HaGRIDDownloader:
         """
         stats = {}
         
-        for gesture in os.listdir(self.data_dir):
-            gesture_path = self.data_dir / gesture
-            if gesture_path.is_dir():
-                # Count images
-                image_count = len(list(gesture_path.glob('**/*.jpg'))) + \
-                             len(list(gesture_path.glob('**/*.png')))
-                stats[gesture] = image_count
+        with os.scandir(self.data_dir) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    # Count images
+                    stats[entry.name] = _count_images(entry.path)
         
         return stats
 
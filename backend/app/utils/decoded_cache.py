@@ -0,0 +1,102 @@
+"""
+Decoded Cache - On-disk cache of decoded dataset images
+
+Dataset processing is often re-run (different max_images_per_gesture,
+feature changes) over the same JPEGs. With the cache enabled, every
+decoded image is stored once as a raw .npy file and later runs load it
+memory-mapped instead of decoding again.
+
+Disabled by default; enable with ImageProcessor(decode_cache=...) or by
+setting $GRS_DECODE_CACHE to a cache directory.
+"""
+import cv2
+import numpy as np
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DECODE_CACHE_ENV = "GRS_DECODE_CACHE"
+
+
+class DecodedCache:
+    """
+    Decoded images keyed by path, mtime, size and imread flag
+
+    Entries are plain .npy files (written atomically, so several worker
+    processes can share one directory). A changed source file gets a new
+    key; stale entries are never read, only left behind.
+    """
+
+    def __init__(self, cache_dir: str = './data/cache'):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Directory for cached .npy files
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _cache_path(self, image_path: str, imread_flag: int) -> Optional[Path]:
+        """Cache file for an image, or None if the source can't be stat'ed"""
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+
+        key = f"{os.path.abspath(image_path)}:{stat.st_mtime_ns}:{stat.st_size}:{imread_flag}"
+        return self.cache_dir / f"{hashlib.sha1(key.encode()).hexdigest()}.npy"
+
+    def imread(self, image_path: str, imread_flag: int = cv2.IMREAD_COLOR) -> Optional[np.ndarray]:
+        """
+        cv2.imread through the cache
+
+        Args:
+            image_path: Path to image
+            imread_flag: cv2.imread flag (part of the cache key)
+
+        Returns:
+            Image (read-only memmap on a cache hit) or None if unreadable
+        """
+        cache_path = self._cache_path(image_path, imread_flag)
+        if cache_path is None:
+            return None
+
+        try:
+            return np.load(cache_path, mmap_mode='r')
+        except (OSError, ValueError):
+            pass
+
+        image = cv2.imread(str(image_path), imread_flag)
+        if image is not None:
+            self._store(cache_path, image)
+        return image
+
+    def _store(self, cache_path: Path, image: np.ndarray):
+        """Write an entry atomically (temp file + rename)"""
+        tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.save(f, image)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Decode cache write failed ({e})")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def read_image(
+    image_path: str,
+    imread_flag: int = cv2.IMREAD_COLOR,
+    cache: Optional[DecodedCache] = None
+) -> Optional[np.ndarray]:
+    """cv2.imread, through cache when one is given"""
+    if cache is None:
+        return cv2.imread(str(image_path), imread_flag)
+    return cache.imread(image_path, imread_flag)
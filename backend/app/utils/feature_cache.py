@@ -0,0 +1,127 @@
+"""
+Feature Cache - On-disk cache of per-image extraction results
+
+Re-running dataset processing (after adding a gesture, changing
+max_images_per_gesture, ...) otherwise runs MediaPipe again on every
+unchanged image. With the cache enabled, the features of each image (or
+the fact that no hand was found) are stored once with joblib.Memory,
+keyed by the file's content hash: renamed or moved files still hit, an
+edited file misses. The key also holds FEATURE_VERSION and the detector
+settings, so changing feature extraction (bump FEATURE_VERSION) or the
+detector never reuses stale features.
+
+Disabled by default; enable with ImageProcessor(feature_cache=...) or by
+setting $GRS_FEATURE_CACHE to a cache directory. FeatureCache.clear drops
+entries that can no longer be hit.
+"""
+import numpy as np
+import hashlib
+import joblib
+import logging
+from typing import Callable, Optional, Tuple
+
+from app.utils.landmark_ops import FEATURE_VERSION
+
+# Optional: xxHash for content keys (faster than blake2b on big JPEGs)
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+logger = logging.getLogger(__name__)
+
+FEATURE_CACHE_ENV = "GRS_FEATURE_CACHE"
+
+# image_path, imread_flag -> (features, metadata) or None
+ExtractFn = Callable[[str, int], Optional[Tuple[np.ndarray, dict]]]
+
+
+def file_digest(image_path: str) -> Optional[str]:
+    """Content hash of a file, or None if it can't be read"""
+    try:
+        with open(image_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    if HAS_XXHASH:
+        return xxhash.xxh64(data).hexdigest()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _extract_features(
+    digest: str,
+    imread_flag: int,
+    feature_version: int,
+    detector_config: dict,
+    image_path: str,
+    extract: ExtractFn
+) -> Optional[np.ndarray]:
+    """Cached unit: features only (metadata holds the path, which may change)"""
+    result = extract(image_path, imread_flag)
+    return None if result is None else result[0]
+
+
+class FeatureCache:
+    """
+    Features per image keyed by file content hash, imread flag, feature
+    version and detector settings
+
+    Backed by joblib.Memory, safe to share between worker processes.
+    """
+
+    def __init__(self, cache_dir: str = './data/cache/features'):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: joblib.Memory location
+        """
+        self.cache_dir = cache_dir
+        self.memory = joblib.Memory(cache_dir, verbose=0)
+        self._extract_features = self.memory.cache(
+            _extract_features, ignore=['image_path', 'extract']
+        )
+
+    def get(
+        self,
+        image_path: str,
+        imread_flag: int,
+        extract: ExtractFn,
+        detector_config: dict
+    ) -> Optional[Tuple[np.ndarray, dict]]:
+        """
+        extract(image_path, imread_flag) through the cache
+
+        Args:
+            image_path: Path to image
+            imread_flag: cv2.imread flag (part of the cache key)
+            extract: Uncached image -> (features, metadata) function
+            detector_config: HandDetector.config of the detector extract uses
+                             (part of the cache key)
+
+        Returns:
+            Tuple of (features, metadata) or None if unreadable / no hand
+        """
+        digest = file_digest(image_path)
+        if digest is None:
+            return extract(image_path, imread_flag)
+
+        features = self._extract_features(
+            digest, imread_flag, FEATURE_VERSION, detector_config, image_path, extract
+        )
+        if features is None:
+            return None
+
+        metadata = {
+            'image_path': str(image_path),
+            'num_landmarks': 21,
+            'num_features': len(features)
+        }
+        return features, metadata
+
+    def clear(self):
+        """Drop all cached results"""
+        self.memory.clear(warn=False)
+        logger.info(f"🗑️ Feature cache cleared: {self.cache_dir}")
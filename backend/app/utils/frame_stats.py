@@ -0,0 +1,31 @@
+"""
+Frame Statistics
+Per-frame bookkeeping for live loops: FPS over a frame window
+"""
+import time
+
+
+class FpsCounter:
+    """
+    Frames per second, recomputed every `window` frames
+
+    update() is one increment and compare per frame; the clock is only
+    read when a window completes.
+    """
+
+    def __init__(self, window: int = 30):
+        self.window = window
+        self.fps = 0.0
+        self._frames = 0
+        self._start = time.perf_counter()
+
+    def update(self) -> float:
+        """Count one frame, return the current FPS"""
+        self._frames += 1
+        if self._frames >= self.window:
+            now = time.perf_counter()
+            self.fps = self._frames / (now - self._start)
+            self._start = now
+            self._frames = 0
+        return self.fps
+
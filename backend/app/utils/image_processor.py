@@ -4,15 +4,166 @@ from pathlib import Path
 import logging
 from typing import List, Tuple, Optional, Dict
 import json
+import os
+import math
+import random
+import zlib
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from tqdm import tqdm
 
-from app.services.hand_detector import hand_detector
-from app.services.feature_processor import feature_processor
+from app.services.hand_detector import HandDetector
+from app.services.feature_processor import feature_processor, NUM_FEATURES
+from app.utils import image_worker
+from app.utils.dataset_downloader import HaGRIDDownloader
+from app.utils.decoded_cache import DecodedCache, DECODE_CACHE_ENV, read_image
+from app.utils.feature_cache import FeatureCache, FEATURE_CACHE_ENV
 
+# Optional: NVIDIA DALI for GPU (nvJPEG) decoding
+try:
+    from nvidia.dali import pipeline_def, fn, types
+    HAS_DALI = True
+except ImportError:
+    HAS_DALI = False
 
 
 logger = logging.getLogger(__name__)
 
+# In-process path: decode this many images ahead of detection
+PREFETCH_THREADS = 8
+PREFETCH_AHEAD = 16
+
+# Progress bars redraw at most ~200 times per run / twice a second
+PROGRESS_STEPS = 200
+PROGRESS_INTERVAL = 0.5
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Saved feature precision: normalized coords / distances / angles keep
+# ~3 significant digits in float16, ample for the classifier, at half
+# the size of float32 (training upcasts on load)
+FEATURE_STORAGE_DTYPE = np.float16
+
+
+def _progress(iterable, total: int, desc: str):
+    """tqdm with batched refreshes (no terminal write per image)"""
+    return tqdm(
+        iterable,
+        total=total,
+        desc=desc,
+        miniters=max(1, total // PROGRESS_STEPS),
+        mininterval=PROGRESS_INTERVAL,
+        smoothing=0
+    )
+
+
+def _iter_images(root: Path, recursive: bool):
+    """
+    Yield image paths under root in a single directory walk
+
+    Extensions are matched case-insensitively. Symlinked directories are
+    not followed (avoids cycles).
+    """
+    with os.scandir(root) as entries:
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                yield Path(entry.path)
+    
+    if recursive:
+        for subdir in subdirs:
+            yield from _iter_images(subdir, recursive)
+
+
+def _reservoir_sample(items, k: int, rng: random.Random) -> list:
+    """
+    Uniform random sample of k items from an iterable of unknown length
+
+    Algorithm L: O(k) memory, and random numbers are only drawn for the
+    items that enter the reservoir (geometric skips in between).
+    """
+    items = iter(items)
+    reservoir = list(itertools.islice(items, k))
+    if len(reservoir) < k:
+        return reservoir
+    
+    w = math.exp(math.log(rng.random()) / k)
+    while True:
+        skip = math.floor(math.log(rng.random()) / math.log(1 - w))
+        item = next(itertools.islice(items, skip, None), None)
+        if item is None:
+            return reservoir
+        reservoir[rng.randrange(k)] = item
+        w *= math.exp(math.log(rng.random()) / k)
+
+
+def _prefetch_images(
+    image_files: List[Path],
+    imread_flag: int = cv2.IMREAD_COLOR,
+    cache: Optional[DecodedCache] = None
+):
+    """
+    Yield (path, image) in order while later images decode in background threads
+
+    cv2.imread releases the GIL, so disk reads / JPEG decoding overlap with
+    MediaPipe inference in the caller. At most PREFETCH_AHEAD decoded images
+    are held at once.
+    """
+    with ThreadPoolExecutor(max_workers=PREFETCH_THREADS) as pool:
+        pending = deque()
+        files = iter(image_files)
+        
+        for image_path in files:
+            pending.append((image_path, pool.submit(read_image, image_path, imread_flag, cache)))
+            if len(pending) >= PREFETCH_AHEAD:
+                break
+        
+        while pending:
+            image_path, future = pending.popleft()
+            next_path = next(files, None)
+            if next_path is not None:
+                pending.append((next_path, pool.submit(read_image, next_path, imread_flag, cache)))
+            yield image_path, future.result()
+
+if HAS_DALI:
+    @pipeline_def
+    def _dali_decode_pipeline(files):
+        """File reader -> mixed (CPU parse + nvJPEG) decode, RGB HWC"""
+        encoded, _ = fn.readers.file(files=files, pad_last_batch=True, name='reader')
+        return fn.decoders.image(encoded, device='mixed', output_type=types.RGB)
+
+
+def _dali_images(image_files: List[Path], batch_size: int = 32):
+    """
+    Decode images on the GPU with DALI, yielding (path, rgb_image) in order
+
+    The pipeline is built eagerly so a missing CUDA device raises here
+    (caller falls back to cv2). Decoded batches are copied back to host
+    memory for MediaPipe.
+    """
+    files = [str(p) for p in image_files]
+    pipe = _dali_decode_pipeline(
+        files=files,
+        batch_size=batch_size,
+        num_threads=PREFETCH_THREADS,
+        device_id=0
+    )
+    pipe.build()
+    
+    def generate():
+        for start in range(0, len(files), batch_size):
+            images, = pipe.run()
+            images = images.as_cpu()
+            # Last batch is padded by repeating the final file
+            for i, image_path in enumerate(image_files[start:start + batch_size]):
+                yield image_path, images.at(i)
+    
+    return generate()
+
 class ImageProcessor:
     
     # Gesture mappings for different datasets
@@ -60,30 +211,71 @@ class ImageProcessor:
             'G9': 'gesture_9',
             'G10': 'gesture_10',
             'G11': 'gesture_11'
-        }
+        },
+        # Folders as extracted by scripts/download_hagrid.py
+        'hagrid': HaGRIDDownloader.GESTURE_MAPPING
     }
     
     def __init__(
         self,
-        hand_detector,
+        hand_detector: Optional[HandDetector],
         feature_processor,
-        output_dir: str = './data/processed'
+        output_dir: str = './data/processed',
+        num_workers: Optional[int] = None,
+        use_dali: bool = False,
+        decode_cache: Optional[str] = None,
+        feature_cache: Optional[str] = None
     ):
         """
         Initialize processor
         
         Args:
-            hand_detector: HandDetector instance
+            hand_detector: HandDetector instance (None = a static-image
+                           detector created on first in-process use)
             feature_processor: FeatureProcessor instance
             output_dir: Where to save processed data
+            num_workers: Worker processes for process_folder
+                         (None = os.cpu_count(), 1 = process in this process)
+            use_dali: Decode JPEGs on the GPU with NVIDIA DALI (in-process
+                      path only; falls back to cv2 without DALI / CUDA)
+            decode_cache: Directory for cached decoded images, reused by
+                          later runs (defaults to $GRS_DECODE_CACHE; None
+                          disables caching)
+            feature_cache: Directory for cached per-image features keyed by
+                           file content, so later runs skip detection on
+                           unchanged images (defaults to $GRS_FEATURE_CACHE;
+                           None disables caching)
         """
-        self.hand_detector = hand_detector
+        self._hand_detector = hand_detector
         self.feature_processor = feature_processor
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self._executor = None
+        
+        # Gesture name -> int32 label code for saved files
+        self._class_registry: Dict[str, int] = {}
+        
+        if use_dali and not HAS_DALI:
+            logger.warning("⚠️ NVIDIA DALI not installed, decoding with OpenCV")
+        self.use_dali = use_dali and HAS_DALI
+        
+        decode_cache = decode_cache or os.environ.get(DECODE_CACHE_ENV)
+        self.decode_cache = DecodedCache(decode_cache) if decode_cache else None
+        
+        feature_cache = feature_cache or os.environ.get(FEATURE_CACHE_ENV)
+        self.feature_cache = FeatureCache(feature_cache) if feature_cache else None
+        
         logger.info("ImageProcessor initialized")
     
+    @property
+    def hand_detector(self) -> HandDetector:
+        """Detector for the in-process path (worker processes build their own)"""
+        if self._hand_detector is None:
+            self._hand_detector = HandDetector(static_image_mode=True, max_num_hands=1)
+        return self._hand_detector
+    
     def get_gesture_name(self, folder_name: str, dataset_type: str = None) -> str:
         """
         Map folder name to gesture name based on dataset type
@@ -102,56 +294,211 @@ class ImageProcessor:
     
     def process_image(
         self,
-        image_path: str
+        image_path: str,
+        imread_flag: int = cv2.IMREAD_COLOR
     ) -> Optional[Tuple[np.ndarray, dict]]:
         """
         Process single image to features
         
         Args:
             image_path: Path to image
+            imread_flag: cv2.imread flag, e.g. cv2.IMREAD_REDUCED_COLOR_2 to
+                         decode high-res JPEGs at half size (DCT-domain)
             
         Returns:
             Tuple of (features, metadata) or None if no hand detected
         """
+        if self.feature_cache is not None:
+            return self.feature_cache.get(
+                image_path, imread_flag, self._process_image, self.hand_detector.config
+            )
+        return self._process_image(image_path, imread_flag)
+    
+    def _process_image(
+        self,
+        image_path: str,
+        imread_flag: int
+    ) -> Optional[Tuple[np.ndarray, dict]]:
+        """Uncached process_image"""
         # Read image
-        image = cv2.imread(str(image_path))
+        image = read_image(image_path, imread_flag, self.decode_cache)
         if image is None:
             logger.warning(f"Failed to read: {image_path}")
             return None
         
-        # Detect hand
-        image_rgb, results = self.hand_detector.detect_hands(image)
-        landmarks = self.hand_detector.extract_landmarks(results)
-        
-        if not landmarks:
-            return None
+        return image_worker.extract_image_features(
+            image, self.hand_detector, self.feature_processor, image_path
+        )
+    
+    def _iter_batches(
+        self,
+        image_paths: List[Path],
+        batch_size: int = 32,
+        imread_flag: int = cv2.IMREAD_COLOR
+    ):
+        """
+        Yield process_image-style results in order, one feature pass per batch
         
-        # Use first hand only
-        hand_landmarks = landmarks[0]
+        Images decode ahead in background threads (or on the GPU with
+        use_dali); detection runs per image
+        (MediaPipe has no batched hand graph) and the landmarks of every
+        detected hand in the batch go through one extract_features_batch call.
+        """
+        prefetched = None
+        is_rgb = False
+        if self.use_dali and image_paths:
+            try:
+                prefetched = _dali_images(image_paths, batch_size)
+                is_rgb = True
+            except Exception as e:
+                logger.warning(f"⚠️ DALI decoding unavailable ({e}), using OpenCV")
+                self.use_dali = False
+        if prefetched is None:
+            prefetched = _prefetch_images(image_paths, imread_flag, self.decode_cache)
+        
+        points = np.empty((batch_size, 21, 3), dtype=np.float32)
+        
+        while True:
+            batch = list(itertools.islice(prefetched, batch_size))
+            if not batch:
+                break
+            
+            # Detect hands, collecting first-hand landmarks of each hit
+            hits = []
+            for i, (image_path, image) in enumerate(batch):
+                if image is None:
+                    logger.warning(f"Failed to read: {image_path}")
+                    continue
+                
+                image_rgb, results = self.hand_detector.detect_hands(image, input_is_rgb=is_rgb)
+                landmarks = self.hand_detector.extract_landmarks_array(results)
+                if len(landmarks):
+                    points[len(hits)] = landmarks[0]
+                    hits.append(i)
+            
+            batch_results = [None] * len(batch)
+            if hits:
+                try:
+                    features = self.feature_processor.extract_features_batch(points[:len(hits)])
+                    for i, row in zip(hits, features):
+                        batch_results[i] = (row, {
+                            'image_path': str(batch[i][0]),
+                            'num_landmarks': 21,
+                            'num_features': len(row)
+                        })
+                except Exception as e:
+                    logger.error(f"Feature extraction failed for batch: {e}")
+            
+            yield from batch_results
+    
+    def process_batch(
+        self,
+        image_paths: List[str],
+        batch_size: int = 32,
+        imread_flag: int = cv2.IMREAD_COLOR
+    ) -> List[Optional[Tuple[np.ndarray, dict]]]:
+        """
+        Process several images to features in batches
         
-        # Extract features
-        try:
-            features = self.feature_processor.extract_features(hand_landmarks)
+        Args:
+            image_paths: Paths to images
+            batch_size: Images per feature-extraction batch
+            imread_flag: cv2.imread flag (see process_image)
             
-            # Metadata
-            metadata = {
-                'image_path': str(image_path),
-                'num_landmarks': len(hand_landmarks),
-                'num_features': len(features)
-            }
+        Returns:
+            One (features, metadata) tuple or None per image, in input order
+        """
+        return list(self._iter_batches(image_paths, batch_size, imread_flag))
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Worker pool, created on first use and reused across folders
+        
+        Uses spawn: MediaPipe graphs are not fork-safe, so every worker
+        builds its own detector in image_worker.init_worker.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=image_worker.init_worker,
+                initargs=(
+                    self.decode_cache.cache_dir if self.decode_cache else None,
+                    self.feature_cache.cache_dir if self.feature_cache else None
+                )
+            )
+        return self._executor
+    
+    def shutdown_workers(self):
+        """Stop the worker pool (recreated on next use)"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
+    def _find_images(
+        self,
+        folder: Path,
+        gesture_name: str,
+        recursive: bool,
+        max_images: Optional[int]
+    ) -> List[Path]:
+        """
+        Image paths for one gesture folder, sampled down to max_images
+        
+        One walk for every extension; with a limit, samples while walking
+        instead of listing everything first. Seeded per gesture (crc32,
+        since str hash() changes per run).
+        """
+        if max_images:
+            rng = random.Random(zlib.crc32(gesture_name.encode()))
+            return _reservoir_sample(_iter_images(folder, recursive), max_images, rng)
+        return list(_iter_images(folder, recursive))
+    
+    def _save_gesture(
+        self,
+        gesture_name: str,
+        total_images: int,
+        features: np.ndarray,
+        metadata_list: List[dict]
+    ) -> dict:
+        """Write one gesture's features to output_dir and return its stats"""
+        num_processed = len(features)
+        skipped = total_images - num_processed
+        
+        if num_processed:
+            output_file = self.output_dir / f"{gesture_name}.npz"
+            code = self._class_registry.setdefault(gesture_name, len(self._class_registry))
             
-            return features, metadata
+            # Intermediate file: uncompressed (DEFLATE gains little on float
+            # features and dominates save/load time); only the combined
+            # dataset is compressed. Labels are int32 codes into classes.
+            np.savez(
+                output_file,
+                features=features,
+                labels=np.full(num_processed, code, dtype=np.int32),
+                classes=np.array(list(self._class_registry)),
+                metadata=metadata_list
+            )
             
-        except Exception as e:
-            logger.error(f"Feature extraction failed for {image_path}: {e}")
-            return None
+            print(f"   ✅ Processed: {num_processed} samples")
+            print(f"   ⚠️  Skipped: {skipped} (no hand detected)")
+            print(f"   💾 Saved to: {output_file}")
+        
+        return {
+            'gesture': gesture_name,
+            'total_images': total_images,
+            'processed': num_processed,
+            'skipped': skipped,
+            'output_file': str(output_file) if num_processed else None
+        }
     
     def process_folder(
         self,
         folder_path: str,
         gesture_name: str,
         recursive: bool = True,
-        max_images: int = None
+        max_images: int = None,
+        imread_flag: int = cv2.IMREAD_COLOR
     ) -> dict:
         """
         Process all images in folder
@@ -161,73 +508,107 @@ class ImageProcessor:
             gesture_name: Name of gesture (label)
             recursive: Search subfolders
             max_images: Limit number of images to process
+            imread_flag: cv2.imread flag (see process_image)
             
         Returns:
             Dict with processing statistics
         """
-        folder = Path(folder_path)
-        
-        # Find all images
-        if recursive:
-            image_files = list(folder.rglob('*.jpg')) + \
-                         list(folder.rglob('*.png')) + \
-                         list(folder.rglob('*.jpeg'))
-        else:
-            image_files = list(folder.glob('*.jpg')) + \
-                         list(folder.glob('*.png')) + \
-                         list(folder.glob('*.jpeg'))
-        
-        # Limit if specified
-        if max_images and len(image_files) > max_images:
-            import random
-            image_files = random.sample(image_files, max_images)
+        image_files = self._find_images(Path(folder_path), gesture_name, recursive, max_images)
         
         print(f"\n📂 Processing: {gesture_name}")
         print(f"   Found {len(image_files)} images")
         
-        features_list = []
+        # Preallocated output, filled row by row (no list of per-image arrays)
+        features_out = np.empty((len(image_files), NUM_FEATURES), dtype=FEATURE_STORAGE_DTYPE)
+        num_processed = 0
         metadata_list = []
-        skipped = 0
         
-        # Process each image
-        for image_path in tqdm(image_files, desc=gesture_name):
-            result = self.process_image(image_path)
-            
+        # Process each image (across worker processes when num_workers > 1;
+        # GPU decoding stays in this process)
+        if self.num_workers > 1 and len(image_files) > 1 and not self.use_dali:
+            results = self._get_executor().map(
+                image_worker.process_image,
+                image_files,
+                itertools.repeat(imread_flag),
+                chunksize=32
+            )
+        elif self.feature_cache is not None:
+            # Per image, so cached images are never decoded
+            results = (self.process_image(path, imread_flag) for path in image_files)
+        else:
+            results = self._iter_batches(image_files, imread_flag=imread_flag)
+        
+        for result in _progress(results, len(image_files), gesture_name):
             if result:
                 features, metadata = result
-                features_list.append(features)
+                features_out[num_processed] = features
+                num_processed += 1
                 metadata_list.append(metadata)
-            else:
-                skipped += 1
         
         # Save processed data
-        if features_list:
-            output_file = self.output_dir / f"{gesture_name}.npz"
-            
-            np.savez_compressed(
-                output_file,
-                features=np.array(features_list),
-                labels=np.array([gesture_name] * len(features_list)),
-                metadata=metadata_list
-            )
-            
-            print(f"   ✅ Processed: {len(features_list)} samples")
-            print(f"   ⚠️  Skipped: {skipped} (no hand detected)")
-            print(f"   💾 Saved to: {output_file}")
+        return self._save_gesture(
+            gesture_name, len(image_files), features_out[:num_processed], metadata_list
+        )
+    
+    def _process_folders_pooled(
+        self,
+        gesture_folders: List[Path],
+        gesture_names: List[str],
+        max_images: Optional[int],
+        imread_flag: int
+    ) -> List[dict]:
+        """
+        Process several gesture folders through one shared worker pool
         
-        return {
-            'gesture': gesture_name,
-            'total_images': len(image_files),
-            'processed': len(features_list),
-            'skipped': skipped,
-            'output_file': str(output_file) if features_list else None
-        }
+        Images of all folders are interleaved (shuffled) into a single task
+        stream, so a huge folder no longer runs alone at the end while the
+        other workers sit idle. Results are written back to their folder's
+        row, keeping per-folder file order, and saved per folder.
+        """
+        file_lists = [
+            self._find_images(folder, name, True, max_images)
+            for folder, name in zip(gesture_folders, gesture_names)
+        ]
+        
+        tasks = [(g, i) for g, files in enumerate(file_lists) for i in range(len(files))]
+        random.Random(0).shuffle(tasks)
+        print(f"\n⚙️  {len(tasks)} images from {len(file_lists)} folders "
+              f"across {self.num_workers} workers")
+        
+        features_out = [
+            np.empty((len(files), NUM_FEATURES), dtype=FEATURE_STORAGE_DTYPE)
+            for files in file_lists
+        ]
+        metadata_out = [[None] * len(files) for files in file_lists]
+        
+        results = self._get_executor().map(
+            image_worker.process_image,
+            [file_lists[g][i] for g, i in tasks],
+            itertools.repeat(imread_flag),
+            chunksize=64
+        )
+        for (g, i), result in _progress(zip(tasks, results), len(tasks), 'images'):
+            if result:
+                features_out[g][i], metadata_out[g][i] = result
+        
+        all_stats = []
+        for name, files, features, metadata in zip(
+            gesture_names, file_lists, features_out, metadata_out
+        ):
+            hits = [i for i, meta in enumerate(metadata) if meta is not None]
+            print(f"\n📂 Processed: {name}")
+            print(f"   Found {len(files)} images")
+            all_stats.append(self._save_gesture(
+                name, len(files), features[hits], [metadata[i] for i in hits]
+            ))
+        return all_stats
     
     def process_dataset_structure(
         self,
         dataset_root: str,
         dataset_type: str = None,
-        max_images_per_gesture: int = None
+        max_images_per_gesture: int = None,
+        imread_flag: int = cv2.IMREAD_COLOR
     ) -> List[dict]:
         """
         Process dataset with folder structure
@@ -236,6 +617,8 @@ class ImageProcessor:
             dataset_root: Root directory of dataset
             dataset_type: Type (leap, isl, asl, senz3d, etc.)
             max_images_per_gesture: Limit images per gesture
+            imread_flag: cv2.imread flag for every image (e.g.
+                         cv2.IMREAD_REDUCED_COLOR_2 for high-res datasets)
             
         Returns:
             List of processing statistics for each gesture
@@ -266,20 +649,27 @@ class ImageProcessor:
         if len(gesture_folders) > 10:
             print(f"  ... and {len(gesture_folders) - 10} more")
         
-        # Process each gesture
-        all_stats = []
+        # Resolve folder -> gesture names once for the whole dataset
+        resolver = self.GESTURE_MAPPINGS.get(dataset_type, {})
+        gesture_names = [resolver.get(folder.name, folder.name) for folder in gesture_folders]
         
-        for gesture_folder in gesture_folders:
-            original_name = gesture_folder.name
-            gesture_name = self.get_gesture_name(original_name, dataset_type)
-            
-            stats = self.process_folder(
-                folder_path=str(gesture_folder),
-                gesture_name=gesture_name,
-                recursive=True,
-                max_images=max_images_per_gesture
+        # Process each gesture (one pool for all folders when using workers)
+        
+        if self.num_workers > 1 and not self.use_dali:
+            all_stats = self._process_folders_pooled(
+                gesture_folders, gesture_names, max_images_per_gesture, imread_flag
             )
-            all_stats.append(stats)
+        else:
+            all_stats = []
+            for gesture_folder, gesture_name in zip(gesture_folders, gesture_names):
+                stats = self.process_folder(
+                    folder_path=str(gesture_folder),
+                    gesture_name=gesture_name,
+                    recursive=True,
+                    max_images=max_images_per_gesture,
+                    imread_flag=imread_flag
+                )
+                all_stats.append(stats)
         
         # Summary
         print("\n" + "="*60)
@@ -308,8 +698,12 @@ class ImageProcessor:
         """
         Combine all processed gesture files into one dataset
         
+        Written as raw arrays that training opens memory-mapped:
+        <name>_features.npy (float32), <name>_labels.npy (int32 codes)
+        and <name>_classes.json (code -> gesture name).
+        
         Args:
-            output_file: Name of combined output file
+            output_file: Name of combined dataset (extension is ignored)
             
         Returns:
             Dataset statistics
@@ -320,7 +714,7 @@ class ImageProcessor:
         
         # Find all .npz files
         processed_files = list(self.output_dir.glob('*.npz'))
-        processed_files = [f for f in processed_files if f.name != output_file]
+        processed_files = [f for f in processed_files if f.stem != Path(output_file).stem]
         
         if not processed_files:
             print("❌ No processed files found!")
@@ -328,52 +722,78 @@ class ImageProcessor:
         
         print(f"Found {len(processed_files)} processed files")
         
-        all_features = []
+        # First pass: labels (small) give the total row count. Each file's
+        # codes are remapped onto one shared class table (files from older
+        # versions store string labels and get codes here)
+        class_index = {}
         all_labels = []
-        
         for npz_file in processed_files:
-            data = np.load(npz_file, allow_pickle=True)
-            features = data['features']
-            labels = data['labels']
+            with np.load(npz_file, allow_pickle=True) as data:
+                if 'classes' in data:
+                    file_classes, codes = data['classes'], data['labels']
+                else:
+                    file_classes, codes = np.unique(data['labels'], return_inverse=True)
             
-            all_features.append(features)
-            all_labels.extend(labels)
+            remap = np.array(
+                [class_index.setdefault(str(name), len(class_index)) for name in file_classes],
+                dtype=np.int32
+            )
+            all_labels.append(remap[codes] if len(codes) else np.empty(0, dtype=np.int32))
+        
+        combined_labels = np.concatenate(all_labels)
+        classes = np.array(list(class_index))
+        
+        # Second pass: stream features straight into the memory-mapped
+        # output .npy, so peak RAM is one gesture file, not the dataset
+        stem = self.output_dir / Path(output_file).stem
+        features_path = stem.with_name(f"{stem.name}_features.npy")
+        combined_features = np.lib.format.open_memmap(
+            features_path,
+            mode='w+',
+            dtype=np.float32,
+            shape=(len(combined_labels), NUM_FEATURES)
+        )
+        row = 0
+        for npz_file in processed_files:
+            with np.load(npz_file, allow_pickle=True) as data:
+                features = data['features']
+            
+            combined_features[row:row + len(features)] = features
+            row += len(features)
             
             print(f"  - {npz_file.name}: {len(features)} samples")
         
-        # Combine
-        combined_features = np.vstack(all_features)
-        combined_labels = np.array(all_labels)
+        feature_shape = combined_features.shape
+        combined_features.flush()
+        del combined_features
         
-        # Save
-        output_path = self.output_dir / output_file
-        np.savez_compressed(
-            output_path,
-            features=combined_features,
-            labels=combined_labels
-        )
+        np.save(stem.with_name(f"{stem.name}_labels.npy"), combined_labels)
+        with open(stem.with_name(f"{stem.name}_classes.json"), 'w', encoding='utf-8') as f:
+            json.dump(classes.tolist(), f, indent=2)
         
-        print(f"\n✅ Combined dataset saved to: {output_path}")
+        print(f"\n✅ Combined dataset saved to: {features_path}")
         print(f"   Total samples: {len(combined_labels)}")
-        print(f"   Feature shape: {combined_features.shape}")
-        print(f"   Unique gestures: {len(set(combined_labels))}")
+        print(f"   Feature shape: {feature_shape}")
+        print(f"   Unique gestures: {len(classes)}")
         
         # Show gesture distribution
-        unique, counts = np.unique(combined_labels, return_counts=True)
+        counts = np.bincount(combined_labels, minlength=len(classes))
         print(f"\n📊 Gesture Distribution:")
-        for gesture, count in sorted(zip(unique, counts), key=lambda x: -x[1])[:10]:
+        for gesture, count in sorted(zip(classes, counts), key=lambda x: -x[1])[:10]:
             print(f"   {gesture}: {count} samples")
         
         return {
             'total_samples': len(combined_labels),
-            'num_features': combined_features.shape[1],
-            'num_gestures': len(set(combined_labels)),
-            'gestures': list(set(combined_labels)),
-            'output_file': str(output_path)
+            'num_features': feature_shape[1],
+            'num_gestures': len(classes),
+            'gestures': classes.tolist(),
+            'output_file': str(features_path)
         }
 
+# Detector created on first use, so importing this module builds no
+# MediaPipe graph
 image_processor = ImageProcessor(
-    hand_detector=hand_detector,
+    hand_detector=None,
     feature_processor=feature_processor,
     output_dir='./data/processed'
 )
@@ -0,0 +1,125 @@
+"""
+Image Worker - image -> features pipeline for worker processes
+
+Each worker process builds its own HandDetector and FeatureProcessor in
+init_worker (MediaPipe graphs can't be shared across processes), then
+handles images with process_image. Used by ImageProcessor.process_folder.
+"""
+import cv2
+import numpy as np
+import logging
+from typing import Optional, Tuple
+
+from app.services.hand_detector import HandDetector
+from app.services.feature_processor import FeatureProcessor
+from app.utils.decoded_cache import DecodedCache, read_image
+from app.utils.feature_cache import FeatureCache
+
+logger = logging.getLogger(__name__)
+
+# Per-process instances, set by init_worker
+_hand_detector = None
+_feature_processor = None
+_decoded_cache = None
+_feature_cache = None
+
+
+def init_worker(
+    decode_cache_dir: Optional[str] = None,
+    feature_cache_dir: Optional[str] = None
+):
+    """
+    ProcessPoolExecutor initializer: one detector per worker process
+
+    Args:
+        decode_cache_dir: DecodedCache directory (None = no caching)
+        feature_cache_dir: FeatureCache directory (None = no caching)
+    """
+    global _hand_detector, _feature_processor, _decoded_cache, _feature_cache
+    _hand_detector = HandDetector(static_image_mode=True, max_num_hands=1)
+    _feature_processor = FeatureProcessor()
+    _decoded_cache = DecodedCache(decode_cache_dir) if decode_cache_dir else None
+    _feature_cache = FeatureCache(feature_cache_dir) if feature_cache_dir else None
+
+
+def extract_image_features(
+    image: np.ndarray,
+    hand_detector: HandDetector,
+    feature_processor: FeatureProcessor,
+    image_path: str = ''
+) -> Optional[Tuple[np.ndarray, dict]]:
+    """
+    Decoded image -> (features, metadata) for the first detected hand
+
+    Args:
+        image: BGR image
+        hand_detector: HandDetector to use
+        feature_processor: FeatureProcessor to use
+        image_path: Source path (for metadata / logging)
+
+    Returns:
+        Tuple of (features, metadata) or None if no hand detected
+    """
+    # Detect hand
+    image_rgb, results = hand_detector.detect_hands(image)
+    landmarks = hand_detector.extract_landmarks_array(results)
+
+    if not len(landmarks):
+        return None
+
+    # Use first hand only
+    hand_landmarks = landmarks[0]
+
+    # Extract features
+    try:
+        features = feature_processor.extract_features(hand_landmarks)
+
+        # Metadata
+        metadata = {
+            'image_path': str(image_path),
+            'num_landmarks': len(hand_landmarks),
+            'num_features': len(features)
+        }
+
+        return features, metadata
+
+    except Exception as e:
+        logger.error(f"Feature extraction failed for {image_path}: {e}")
+        return None
+
+
+def process_image(
+    image_path: str,
+    imread_flag: int = cv2.IMREAD_COLOR
+) -> Optional[Tuple[np.ndarray, dict]]:
+    """
+    Read one image and extract features with this worker's detector
+
+    Args:
+        image_path: Path to image
+        imread_flag: cv2.imread flag (e.g. cv2.IMREAD_REDUCED_COLOR_2)
+
+    Returns:
+        Tuple of (features, metadata) or None if unreadable / no hand
+    """
+    if _hand_detector is None:
+        init_worker()
+
+    if _feature_cache is not None:
+        return _feature_cache.get(
+            image_path, imread_flag, _read_and_extract, _hand_detector.config
+        )
+    return _read_and_extract(image_path, imread_flag)
+
+
+def _read_and_extract(
+    image_path: str,
+    imread_flag: int
+) -> Optional[Tuple[np.ndarray, dict]]:
+    """Uncached process_image"""
+    image = read_image(image_path, imread_flag, _decoded_cache)
+    if image is None:
+        logger.warning(f"Failed to read: {image_path}")
+        return None
+
+    return extract_image_features(image, _hand_detector, _feature_processor, image_path)
@@ -0,0 +1,165 @@
+"""
+Landmark Operations
+Array kernels for hand landmarks, compiled with Numba when available
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Feature layout tables (shared with app.services.feature_processor)
+FINGER_TIPS = np.array([4, 8, 12, 16, 20])      # Thumb, Index, Middle, Ring, Pinky
+PALM_POINTS = np.array([0, 5, 9, 13, 17])       # Wrist + MCPs
+# Angle at ANGLE_VERTEX formed by ANGLE_A-ANGLE_VERTEX-ANGLE_B:
+# 5 finger joints followed by palm orientation (thumb MCP -> pinky MCP / wrist)
+ANGLE_A = np.array([2, 5, 9, 13, 17, 17])
+ANGLE_VERTEX = np.array([3, 6, 10, 14, 18, 2])
+ANGLE_B = np.array([4, 7, 11, 15, 19, 0])
+
+NUM_FEATURES = 83  # 63 coordinates + 14 distances + 6 angles
+
+# Bump when the feature layout or math changes (part of the FeatureCache key)
+FEATURE_VERSION = 1
+
+
+def _normalize_loops(points, out):
+    """
+    Normalize landmarks into out: wrist-centered, divided by the
+    largest wrist distance (same as FeatureProcessor.normalize_landmarks)
+
+    Args:
+        points: Landmarks (B, 21, 3)
+        out: Output array of the same shape
+
+    Returns:
+        out
+    """
+    for b in range(points.shape[0]):
+        wx = points[b, 0, 0]
+        wy = points[b, 0, 1]
+        wz = points[b, 0, 2]
+
+        # Translate to wrist origin, track max squared distance
+        max_sq = 0.0
+        for i in range(points.shape[1]):
+            dx = points[b, i, 0] - wx
+            dy = points[b, i, 1] - wy
+            dz = points[b, i, 2] - wz
+            out[b, i, 0] = dx
+            out[b, i, 1] = dy
+            out[b, i, 2] = dz
+            dist_sq = dx * dx + dy * dy + dz * dz
+            if dist_sq > max_sq:
+                max_sq = dist_sq
+
+        # Scale normalization (all-zero hands stay zero)
+        if max_sq > 0.0:
+            scale = 1.0 / np.sqrt(max_sq)
+            for i in range(points.shape[1]):
+                out[b, i, 0] *= scale
+                out[b, i, 1] *= scale
+                out[b, i, 2] *= scale
+
+    return out
+
+
+def _normalize_numpy(points, out):
+    """Vectorized NumPy equivalent of _normalize_loops"""
+    np.subtract(points, points[:, 0:1, :], out=out)
+
+    scale = np.sqrt(np.einsum('bij,bij->bi', out, out)).max(axis=1)
+    scale[scale == 0] = 1.0
+
+    out /= scale[:, None, None]
+    return out
+
+
+if HAS_NUMBA:
+    normalize = njit(cache=True, fastmath=True)(_normalize_loops)
+else:
+    normalize = _normalize_numpy
+
+
+def _features_loops(points, out):
+    """
+    Feature vectors for a (B, 21, 3) landmark batch into out (B, 83)
+
+    Explicit-loop version of FeatureProcessor's feature layout for Numba:
+    63 normalized coordinates, 5 tip-to-wrist, 5 tip-to-palm-center and
+    4 adjacent-tip distances, then 6 joint angles in degrees.
+    """
+    norm = np.empty((points.shape[1], 3), dtype=points.dtype)
+
+    for b in range(points.shape[0]):
+        # Normalize (wrist origin, max wrist distance = 1)
+        max_sq = 0.0
+        for i in range(21):
+            for c in range(3):
+                norm[i, c] = points[b, i, c] - points[b, 0, c]
+            dist_sq = norm[i, 0] ** 2 + norm[i, 1] ** 2 + norm[i, 2] ** 2
+            if dist_sq > max_sq:
+                max_sq = dist_sq
+        if max_sq > 0.0:
+            scale = 1.0 / np.sqrt(max_sq)
+            for i in range(21):
+                for c in range(3):
+                    norm[i, c] *= scale
+
+        for i in range(21):
+            for c in range(3):
+                out[b, i * 3 + c] = norm[i, c]
+
+        # Palm center
+        px = 0.0
+        py = 0.0
+        pz = 0.0
+        for k in range(5):
+            px += norm[PALM_POINTS[k], 0]
+            py += norm[PALM_POINTS[k], 1]
+            pz += norm[PALM_POINTS[k], 2]
+        px /= 5.0
+        py /= 5.0
+        pz /= 5.0
+
+        # Distances
+        for k in range(5):
+            t = FINGER_TIPS[k]
+            out[b, 63 + k] = np.sqrt(norm[t, 0] ** 2 + norm[t, 1] ** 2 + norm[t, 2] ** 2)
+            out[b, 68 + k] = np.sqrt((norm[t, 0] - px) ** 2 +
+                                     (norm[t, 1] - py) ** 2 +
+                                     (norm[t, 2] - pz) ** 2)
+        for k in range(4):
+            t1 = FINGER_TIPS[k]
+            t2 = FINGER_TIPS[k + 1]
+            out[b, 73 + k] = np.sqrt((norm[t2, 0] - norm[t1, 0]) ** 2 +
+                                     (norm[t2, 1] - norm[t1, 1]) ** 2 +
+                                     (norm[t2, 2] - norm[t1, 2]) ** 2)
+
+        # Angles
+        for k in range(6):
+            a = ANGLE_A[k]
+            v = ANGLE_VERTEX[k]
+            c2 = ANGLE_B[k]
+            x1 = norm[a, 0] - norm[v, 0]
+            y1 = norm[a, 1] - norm[v, 1]
+            z1 = norm[a, 2] - norm[v, 2]
+            x2 = norm[c2, 0] - norm[v, 0]
+            y2 = norm[c2, 1] - norm[v, 1]
+            z2 = norm[c2, 2] - norm[v, 2]
+            n1 = np.sqrt(x1 * x1 + y1 * y1 + z1 * z1) + 1e-10
+            n2 = np.sqrt(x2 * x2 + y2 * y2 + z2 * z2) + 1e-10
+            cosine = (x1 * x2 + y1 * y2 + z1 * z2) / (n1 * n2)
+            cosine = min(1.0, max(-1.0, cosine))
+            out[b, 77 + k] = np.degrees(np.arccos(cosine))
+
+    return out
+
+
+if HAS_NUMBA:
+    compute_features = njit(cache=True, fastmath=True)(_features_loops)
+else:
+    # The NumPy path in FeatureProcessor is used instead
+    compute_features = None
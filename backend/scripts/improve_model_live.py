@@ -11,6 +11,7 @@ import joblib
 import time
 import numpy as np
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # Setup paths
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -20,6 +21,10 @@ from app.services.camera_manager import CameraManager
 from app.services.hand_detector import HandDetector
 from app.services.feature_processor import FeatureProcessor
 
+# JPEG encoding + disk writes run off the UI loop
+JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 85, cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="correction-writer")
+
 def load_model(model_dir='./models'):
     path = Path(model_dir)
     try:
@@ -30,6 +35,13 @@ def load_model(model_dir='./models'):
         print(f"❌ Error loading model: {e}")
         return None, None
 
+def _write_jpeg(filepath, frame):
+    ok, buf = cv2.imencode('.jpg', frame, JPEG_PARAMS)
+    if ok:
+        filepath.write_bytes(buf.tobytes())
+    else:
+        print(f"❌ Failed to encode: {filepath.name}")
+
 def save_correction(frame, gesture_name, base_dir='./data/collected'):
     """Save the current frame as a training sample for the correct gesture"""
     save_dir = Path(base_dir) / gesture_name
@@ -39,7 +51,8 @@ def save_correction(frame, gesture_name, base_dir='./data/collected'):
     filename = f"correction_{timestamp}.jpg"
     filepath = save_dir / filename
     
-    cv2.imwrite(str(filepath), frame)
+    # Encoded and written in the background (copy: camera may reuse the buffer)
+    _writer.submit(_write_jpeg, filepath, frame.copy())
     print(f"✅ Saved correction for: [{gesture_name}] -> {filename}")
 
 def main():
@@ -52,6 +65,13 @@ def main():
         print("First run: python scripts/train_model.py")
         return
 
+    # Class names indexed directly by argmax (no inverse_transform per frame)
+    classes = np.asarray(label_encoder.classes_)
+    
+    # Warm-up: the first predict_proba pays one-time input validation and
+    # tree paging costs; do it here, not on the first camera frame
+    model.predict_proba(np.zeros((1, model.n_features_in_), dtype=np.float32))
+    
     camera = CameraManager()
     detector = HandDetector(max_num_hands=1, min_detection_confidence=0.7)
     processor = FeatureProcessor()
@@ -90,6 +110,7 @@ def main():
     last_pred_time = time.time()
     current_prediction = "None"
     confidence = 0.0
+    output_image = None  # Preview buffer, reused across frames
 
     try:
         while True:
@@ -98,19 +119,19 @@ def main():
             
             # Detection
             rgb, results = detector.detect_hands(frame)
-            landmarks = detector.extract_landmarks(results)
-            output_image = detector.draw_landmarks(rgb, results)
+            landmarks = detector.extract_landmarks_array(results)
+            output_image = detector.draw_landmarks(rgb, results, out=output_image)
             
             # Prediction (every few ms to be stable)
-            if landmarks and (time.time() - last_pred_time > 0.05):
+            if len(landmarks) and (time.time() - last_pred_time > 0.05):
                 features = processor.extract_features(landmarks[0])
                 features = features.reshape(1, -1)
                 
-                pred_idx = model.predict(features)[0]
                 probs = model.predict_proba(features)[0]
+                pred_idx = int(np.argmax(probs))
                 
-                current_prediction = label_encoder.inverse_transform([pred_idx])[0]
-                confidence = probs[pred_idx]
+                current_prediction = classes[pred_idx]
+                confidence = float(probs[pred_idx])
                 last_pred_time = time.time()
 
             # UI Display
@@ -145,6 +166,7 @@ def main():
                 cv2.waitKey(200) # Brief pause to show saved status
 
     finally:
+        _writer.shutdown(wait=True)  # Finish pending corrections
         cv2.destroyAllWindows()
         camera.cleanup()
         detector.cleanup()
@@ -8,6 +8,8 @@ import sys
 import os
 from pathlib import Path
 
+import cv2
+
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, backend_dir)
 
@@ -59,7 +61,8 @@ def main():
             'type': 'egohands',
             'enabled': False,  # Włącz jeśli chcesz
             'max_per_gesture': 500,
-            'priority': 4
+            'priority': 4,
+            'imread_flag': cv2.IMREAD_REDUCED_COLOR_2  # 1280x720 -> 640x360
         },
         
         # === ISL ===
@@ -90,6 +93,17 @@ def main():
             'enabled': False,
             'max_per_gesture': 200,
             'priority': 7
+        },
+        
+        # === HAGRID (scripts/download_hagrid.py) ===
+        {
+            'name': '🤚 HaGRID',
+            'path': './data/hagrid',
+            'type': 'hagrid',
+            'enabled': False,
+            'max_per_gesture': 1000,
+            'priority': 8,
+            'imread_flag': cv2.IMREAD_REDUCED_COLOR_2  # Full HD -> 960x540
         }
     ]
 
@@ -121,7 +135,8 @@ def main():
     
     # Initialize processors
     print("\n🔧 Initializing components...")
-    hand_detector = HandDetector()
+    # Static-image mode: dataset images are unrelated, so skip the tracker
+    hand_detector = HandDetector(static_image_mode=True, max_num_hands=1)
     feature_processor = FeatureProcessor()
     image_processor = ImageProcessor(
         hand_detector=hand_detector,
@@ -150,7 +165,10 @@ def main():
         stats = image_processor.process_dataset_structure(
             dataset_root=dataset['path'],
             dataset_type=dataset['type'],
-            max_images_per_gesture=dataset['max_per_gesture']
+            max_images_per_gesture=dataset['max_per_gesture'],
+            # Reduced decode for high-res sources; landmarks are normalized,
+            # so features don't depend on the decoded size
+            imread_flag=dataset.get('imread_flag', cv2.IMREAD_COLOR)
         )
         all_stats.extend(stats)
     
@@ -175,7 +193,9 @@ def main():
     else:
         print("\n⚠️  No datasets were processed.")
     
-    # Cleanup
+    # Cleanup (worker pool is shared by all datasets above, so each worker
+    # built its MediaPipe graph once for the whole run)
+    image_processor.shutdown_workers()
     hand_detector.cleanup()
 
 if __name__ == "__main__":
@@ -32,12 +32,15 @@ def main():
     
     # Initialize
     print("\n🔧 Initializing components...")
-    hand_detector = HandDetector()
+    # Static-image mode: dataset images are unrelated, so skip the tracker
+    hand_detector = HandDetector(static_image_mode=True, max_num_hands=1)
     feature_processor = FeatureProcessor()
     image_processor = ImageProcessor(
         hand_detector=hand_detector,
         feature_processor=feature_processor,
-        output_dir='./data/processed'
+        output_dir='./data/processed',
+        # Re-runs skip MediaPipe on images processed before
+        feature_cache='./data/cache/features'
     )
     print("✅ Components ready\n")
     
@@ -60,6 +63,7 @@ def main():
     combined_stats = image_processor.combine_processed_data()
     
     # Cleanup
+    image_processor.shutdown_workers()
     hand_detector.cleanup()
     
     print("\n✅ Processing complete!")
@@ -7,59 +7,251 @@ import sys
 import os
 import numpy as np
 import cv2
-import joblib
 from pathlib import Path
 import time
+import queue
+import threading
 
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, backend_dir)
 
 from app.services.camera_manager import CameraManager
+from app.services.pipeline import (
+    put_latest, scene_thumbnail, STATIC_DIFF_THRESHOLD, STATIC_MAX_REUSE
+)
 from app.services.hand_detector import HandDetector
-from app.services.feature_processor import FeatureProcessor
+from app.services.feature_processor import FeatureProcessor, NUM_FEATURES
+from app.services.gesture_recognizer import GestureRecognizer, gesture_recognizer
+
+# Reused model input row; float32 is what both ONNX Runtime and the
+# forest predict on, so no conversion copy per frame
+_features_buf = np.empty((1, NUM_FEATURES), dtype=np.float32)
+
+# Overlay colors (BGR)
+COLOR_NO_HAND = (0, 0, 255)       # Red
+COLOR_CONFIDENT = (0, 255, 0)     # Green
+COLOR_UNSURE = (0, 255, 255)      # Yellow
+COLOR_FPS = (255, 255, 255)
 
 def load_model(model_dir='./models'):
-    """Load trained model"""
+    """
+    Load trained model
+    
+    Uses GestureRecognizer, so models/gesture_model.onnx runs on ONNX
+    Runtime when available (tree ensemble in native code) and the joblib
+    pickle otherwise.
+    """
     print("📦 Loading model...")
     
     model_path = Path(model_dir)
     
-    model = joblib.load(model_path / 'gesture_model.pkl')
-    label_encoder = joblib.load(model_path / 'label_encoder.pkl')
+    # Reuse the service's already-loaded instance for the same directory
+    if model_path.resolve() == gesture_recognizer.model_dir.resolve():
+        model = gesture_recognizer
+    else:
+        model = GestureRecognizer(model_dir=model_path)
     
-    print(f"✅ Model loaded!")
-    print(f"   Classes: {len(label_encoder.classes_)}")
+    if model.label_encoder is None:
+        raise FileNotFoundError(f"No trained model in {model_path}")
     
-    return model, label_encoder
+    print(f"✅ Model loaded! ({'ONNX Runtime' if model.session is not None else 'scikit-learn'})")
+    # Class names by index, resolved once (no inverse_transform per frame)
+    classes = tuple(model.label_encoder.classes_.tolist())
+    print(f"   Classes: {len(classes)}")
+    
+    return model, classes
 
-def predict_gesture(features, model, label_encoder):
-    """Predict gesture from features"""
-    # Reshape for single prediction
-    features_reshaped = features.reshape(1, -1)
+def predict_gesture(features, model):
+    """Predict gesture from features -> (class index, confidence)"""
+    # Copy into the preallocated (1, 83) row
+    _features_buf[0] = features
+    
+    # Predict (one tree pass; predict() would traverse the forest again)
+    probabilities = model.predict_proba(_features_buf)[0]
+    prediction = int(np.argmax(probabilities))
+    
+    return prediction, probabilities[prediction]
+
+def capture_loop(camera_manager, frames, stop):
+    """Capture stage: keep the newest camera frame in frames"""
+    while not stop.is_set():
+        frame = camera_manager.get_latest_frame(0)
+        if frame is None:
+            stop.set()
+            break
+        put_latest(frames, frame)
+
+class LivePredictor:
+    """
+    Landmarks -> smoothed gesture display text
+    
+    Runs as the HandDetector result callback (MediaPipe's thread in
+    LIVE_STREAM mode); the newest (results, texts) tuple is published in
+    self.latest, a single slot the render loop reads without locking
+    (attribute assignment is atomic).
+    """
     
-    # Predict
-    prediction = model.predict(features_reshaped)[0]
-    probabilities = model.predict_proba(features_reshaped)[0]
+    def __init__(self, feature_processor, model, classes, smooth_window=5):
+        self.feature_processor = feature_processor
+        self.model = model
+        self.classes = classes
+        self.hand_detector = None
+        self.latest = None
+        
+        # Prediction smoothing: majority vote over the last smooth_window
+        # predictions, kept in fixed rings of class indices / confidences,
+        # with per-class vote counts and confidence sums updated on every
+        # push / eviction (no per-frame arrays)
+        self.smooth_window = smooth_window
+        self.pred_ring = np.zeros(smooth_window, dtype=np.int32)
+        self.conf_ring = np.zeros(smooth_window, dtype=np.float32)
+        self.ring_pos = 0
+        self.ring_len = 0
+        self.count_by_class = np.zeros(len(classes), dtype=np.int32)
+        self.sum_conf_by_class = np.zeros(len(classes), dtype=np.float32)
     
-    # Get gesture name and confidence
-    gesture_name = label_encoder.inverse_transform([prediction])[0]
-    confidence = probabilities[prediction]
+    def on_result(self, results, timestamp_ms):
+        """HandDetector result_callback: predict, publish to latest"""
+        self.latest = (results,) + self.describe(
+            self.hand_detector.extract_landmarks_array(results)
+        )
     
-    return gesture_name, confidence
+    def smooth(self, prediction, confidence):
+        """Push a prediction, return the majority vote once 3 are in"""
+        pos = self.ring_pos
+        if self.ring_len == self.smooth_window:
+            # Evict the entry being overwritten
+            evicted = self.pred_ring[pos]
+            self.count_by_class[evicted] -= 1
+            if self.count_by_class[evicted]:
+                self.sum_conf_by_class[evicted] -= self.conf_ring[pos]
+            else:
+                self.sum_conf_by_class[evicted] = 0.0  # No rounding drift
+        else:
+            self.ring_len += 1
+        
+        self.pred_ring[pos] = prediction
+        self.conf_ring[pos] = confidence
+        self.count_by_class[prediction] += 1
+        self.sum_conf_by_class[prediction] += confidence
+        self.ring_pos = (pos + 1) % self.smooth_window
+        
+        # Get most common prediction (ties: lowest class index)
+        if self.ring_len >= 3:
+            prediction = int(self.count_by_class.argmax())
+            confidence = self.sum_conf_by_class[prediction] / self.count_by_class[prediction]
+        
+        return prediction, confidence
+    
+    def describe(self, landmarks):
+        """Landmarks -> (gesture_text, confidence_text, text_color)"""
+        if not len(landmarks):
+            return "No hand detected", "", COLOR_NO_HAND
+        
+        try:
+            # Extract features
+            features = self.feature_processor.extract_features(landmarks[0])
+            
+            # Predict
+            prediction, confidence = self.smooth(*predict_gesture(features, self.model))
+            
+            # Class name only for display
+            gesture_name = self.classes[prediction]
+            
+            text_color = COLOR_CONFIDENT if confidence > 0.7 else COLOR_UNSURE
+            return f"Gesture: {gesture_name}", f"Confidence: {confidence*100:.1f}%", text_color
+        
+        except Exception as e:
+            return f"Error: {e}", "", COLOR_NO_HAND
+
+def inference_loop(frames, outputs, stop, hand_detector, predictor):
+    """
+    Inference stage: submit frames for detection, annotate with the newest
+    result, newest annotated frame in outputs
+    
+    With the Tasks landmarker (LIVE_STREAM) detection runs asynchronously,
+    so a frame is drawn with the latest finished result (typically the
+    previous frame's); legacy Hands detects before returning.
+    """
+    # FPS tracking
+    fps_start = time.time()
+    fps_frames = 0
+    fps = 0
+    
+    # Static-scene gate (pipeline defaults): thumbnail of the last submitted
+    # frame; while the scene stays still the last result is reused
+    key_thumb = None
+    reused = 0
+    
+    while not stop.is_set():
+        try:
+            frame = frames.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        
+        thumb = scene_thumbnail(frame)
+        if (
+            predictor.latest is not None
+            and reused < STATIC_MAX_REUSE
+            and cv2.absdiff(key_thumb, thumb).mean() < STATIC_DIFF_THRESHOLD
+        ):
+            # Scene unchanged: keep the last result, skip detection
+            reused += 1
+        else:
+            key_thumb = thumb
+            reused = 0
+            hand_detector.detect_async(frame)
+        
+        latest = predictor.latest
+        if latest is None:
+            # First async result not in yet
+            continue
+        results, gesture_text, confidence_text, text_color = latest
+        
+        # Draw landmarks (in place on the BGR frame, it is not saved)
+        output_image = hand_detector.draw_landmarks(None, results, frame=frame)
+        
+        # Calculate FPS
+        fps_frames += 1
+        if fps_frames >= 30:
+            fps_end = time.time()
+            fps = fps_frames / (fps_end - fps_start)
+            fps_start = fps_end
+            fps_frames = 0
+        
+        # Display info (Hershey putText only touches the glyph strokes,
+        # cheaper than blitting a cached text patch)
+        cv2.putText(output_image, f"FPS: {fps:.1f}", (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, COLOR_FPS, 2)
+        cv2.putText(output_image, gesture_text, (10, 80),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, text_color, 3)
+        if confidence_text:
+            cv2.putText(output_image, confidence_text, (10, 130),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, text_color, 2)
+        
+        put_latest(outputs, output_image)
 
 def main():
     print("\n" + "="*60)
     print("🎥 LIVE GESTURE RECOGNITION TEST")
     print("="*60)
     
+    # Per-frame OpenCV work here is small (color conversion, thumbnail,
+    # text drawing) and already spread over three threads; OpenCV's own
+    # thread pool would only contend with them and MediaPipe's threads
+    cv2.setNumThreads(1)
+    
     # Load model
-    model, label_encoder = load_model()
+    model, classes = load_model()
     
     # Initialize components
     print("\n🔧 Initializing components...")
     camera_manager = CameraManager()
-    hand_detector = HandDetector(max_num_hands=1)
-    feature_processor = FeatureProcessor()
+    predictor = LivePredictor(FeatureProcessor(), model, classes)
+    # LIVE_STREAM when a hand_landmarker.task is configured
+    # ($GRS_HAND_LANDMARKER), synchronous legacy Hands otherwise
+    hand_detector = HandDetector(max_num_hands=1, result_callback=predictor.on_result)
+    predictor.hand_detector = hand_detector
     
     # Setup camera
     cameras = camera_manager.detect_usb_cameras()
@@ -67,7 +259,8 @@ def main():
         print("❌ No camera found!")
         return
     
-    camera_manager.add_camera(0, str(cameras[0]), 'usb')
+    # MJPG keeps USB transfer small at 30 FPS (not every webcam offers it)
+    camera_manager.add_camera(0, str(cameras[0]), 'usb', fourcc='MJPG')
     print("✅ Camera ready!")
     
     print("\n" + "="*60)
@@ -75,84 +268,32 @@ def main():
     print("Press 'q' to quit")
     print("="*60 + "\n")
     
-    # FPS tracking
-    fps_start = time.time()
-    fps_frames = 0
-    fps = 0
+    # Pipeline: capture thread -> inference thread -> display (main thread,
+    # HighGUI windows must stay on it). 1-slot queues hand over only the
+    # newest item, so each stage runs at its own pace
+    stop = threading.Event()
+    frames = queue.Queue(maxsize=1)
+    outputs = queue.Queue(maxsize=1)
     
-    # Prediction smoothing
-    last_predictions = []
-    smooth_window = 5
+    threads = [
+        threading.Thread(
+            target=capture_loop, args=(camera_manager, frames, stop), daemon=True
+        ),
+        threading.Thread(
+            target=inference_loop,
+            args=(frames, outputs, stop, hand_detector, predictor),
+            daemon=True
+        ),
+    ]
+    for thread in threads:
+        thread.start()
     
     try:
-        while True:
-            # Get frame
-            frame = camera_manager.get_frame(0)
-            if frame is None:
-                break
-            
-            # Detect hand
-            image_rgb, results = hand_detector.detect_hands(frame)
-            landmarks = hand_detector.extract_landmarks(results)
-            
-            # Draw landmarks
-            output_image = hand_detector.draw_landmarks(image_rgb, results)
-            
-            # Predict if hand detected
-            gesture_text = "No hand detected"
-            confidence_text = ""
-            text_color = (0, 0, 255)  # Red
-            
-            if landmarks:
-                try:
-                    # Extract features
-                    features = feature_processor.extract_features(landmarks[0])
-                    
-                    # Predict
-                    gesture_name, confidence = predict_gesture(
-                        features, model, label_encoder
-                    )
-                    
-                    # Smoothing
-                    last_predictions.append((gesture_name, confidence))
-                    if len(last_predictions) > smooth_window:
-                        last_predictions.pop(0)
-                    
-                    # Get most common prediction
-                    if len(last_predictions) >= 3:
-                        gestures = [p[0] for p in last_predictions]
-                        from collections import Counter
-                        most_common = Counter(gestures).most_common(1)[0][0]
-                        avg_confidence = np.mean([p[1] for p in last_predictions if p[0] == most_common])
-                        
-                        gesture_name = most_common
-                        confidence = avg_confidence
-                    
-                    gesture_text = f"Gesture: {gesture_name}"
-                    confidence_text = f"Confidence: {confidence*100:.1f}%"
-                    text_color = (0, 255, 0) if confidence > 0.7 else (0, 255, 255)
-                    
-                except Exception as e:
-                    gesture_text = f"Error: {e}"
-            
-            # Calculate FPS
-            fps_frames += 1
-            if fps_frames >= 30:
-                fps_end = time.time()
-                fps = fps_frames / (fps_end - fps_start)
-                fps_start = fps_end
-                fps_frames = 0
-            
-            # Display info
-            cv2.putText(output_image, f"FPS: {fps:.1f}", (10, 30),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-            
-            cv2.putText(output_image, gesture_text, (10, 80),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.2, text_color, 3)
-            
-            if confidence_text:
-                cv2.putText(output_image, confidence_text, (10, 130),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, text_color, 2)
+        while not stop.is_set():
+            try:
+                output_image = outputs.get(timeout=0.1)
+            except queue.Empty:
+                continue
             
             # Show
             cv2.imshow('Live Gesture Recognition', output_image)
@@ -165,6 +306,9 @@ def main():
         print("\n⚠️ Interrupted")
     
     finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=2)
         cv2.destroyAllWindows()
         camera_manager.cleanup()
         hand_detector.cleanup()
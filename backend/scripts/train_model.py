@@ -10,9 +10,9 @@ import json
 from pathlib import Path
 
 import numpy as np
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import StratifiedShuffleSplit
 from sklearn.preprocessing import LabelEncoder
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.metrics import (
     classification_report,
     confusion_matrix,
@@ -20,16 +20,48 @@ from sklearn.metrics import (
 )
 import joblib
 
+# Optional: LZ4 for the model pickle (decompresses faster than zlib)
+try:
+    import lz4  # noqa: F401  (used by joblib)
+    HAS_LZ4 = True
+except ImportError:
+    HAS_LZ4 = False
+
+# joblib compression for gesture_model.pkl; zlib needs no extra package
+# on the machine that loads the model
+MODEL_COMPRESS = ("lz4", 3) if HAS_LZ4 else ("zlib", 3)
+
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, backend_dir)
 
 
 def load_dataset(dataset_path: str):
-    """Load processed dataset"""
-    print(f"\n[DATA] Loading dataset: {dataset_path}")
-    data = np.load(dataset_path, allow_pickle=True)
-    features = data["features"]
-    labels = data["labels"]
+    """
+    Load processed dataset
+
+    Reads the <name>_features.npy / _labels.npy / _classes.json trio
+    written by ImageProcessor.combine_processed_data, memory-mapped: the
+    split below only materializes the rows it selects. Falls back to a
+    combined .npz from older versions.
+    """
+    dataset_path = Path(dataset_path)
+    features_file = dataset_path.with_name(f"{dataset_path.stem}_features.npy")
+    print(f"\n[DATA] Loading dataset: {dataset_path.stem}")
+
+    if features_file.exists():
+        features = np.load(features_file, mmap_mode="r")
+        labels = np.load(dataset_path.with_name(f"{dataset_path.stem}_labels.npy"), mmap_mode="r")
+        with dataset_path.with_name(f"{dataset_path.stem}_classes.json").open(encoding="utf-8") as f:
+            classes = np.array(json.load(f))
+        # int32 codes + class table -> gesture names
+        labels = classes[labels]
+    else:
+        data = np.load(dataset_path.with_suffix(".npz"), allow_pickle=True)
+        # Stored as float16 by ImageProcessor; train in float32
+        features = data["features"].astype(np.float32)
+        labels = data["labels"]
+        if "classes" in data:
+            labels = data["classes"][labels]
 
     print(f"  Features shape: {features.shape}")
     print(f"  Total samples: {len(labels)}")
@@ -41,18 +73,25 @@ def prepare_data(features, labels):
     """Prepare data for training"""
     print("\n[DATA] Preparing data...")
 
-    # Encode labels
+    # Train in float32 (the dtype features are extracted and predicted
+    # in); a no-op view for the memory-mapped float32 dataset
+    features = np.asarray(features, dtype=np.float32)
+
+    # Encode labels (np.unique gives the same sorted classes_ as
+    # LabelEncoder.fit, without its per-label Python pass)
+    classes, labels_encoded = np.unique(labels, return_inverse=True)
     label_encoder = LabelEncoder()
-    labels_encoded = label_encoder.fit_transform(labels)
+    label_encoder.classes_ = classes
 
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        features,
-        labels_encoded,
-        test_size=0.2,
-        random_state=42,
-        stratify=labels_encoded,
-    )
+    # Stratified split as index arrays; sorted so slicing a memory-mapped
+    # feature matrix reads it front to back
+    splitter = StratifiedShuffleSplit(n_splits=1, test_size=0.2, random_state=42)
+    (train_idx, test_idx), = splitter.split(np.zeros(len(labels_encoded)), labels_encoded)
+    train_idx.sort()
+    test_idx.sort()
+
+    X_train, y_train = features[train_idx], labels_encoded[train_idx]
+    X_test, y_test = features[test_idx], labels_encoded[test_idx]
 
     print(f"  Train samples: {len(X_train)}")
     print(f"  Test samples: {len(X_test)}")
@@ -61,22 +100,26 @@ def prepare_data(features, labels):
 
 
 def train_model(X_train, y_train):
-    """Train Random Forest model"""
-    print("\n[TRAIN] Training Random Forest model...")
+    """
+    Train histogram gradient boosting model
+
+    Shallow boosted trees on binned features: similar accuracy to the
+    previous 100-tree, depth-100 random forest on these 83 features, at
+    a fraction of the model size and per-frame predict cost.
+    """
+    print("\n[TRAIN] Training HistGradientBoosting model...")
     print("        (This may take a few minutes depending on dataset size)")
 
-    model = RandomForestClassifier(
-        n_estimators=100,
-        max_depth=100,
-        min_samples_split=10,
-        min_samples_leaf=2,
+    model = HistGradientBoostingClassifier(
+        max_iter=200,
+        max_depth=8,
+        learning_rate=0.05,
+        early_stopping=True,  # Holds out 10% of train, stops on plateau
         random_state=42,
-        n_jobs=-1,  # Use all CPU cores
-        verbose=1,
     )
 
     model.fit(X_train, y_train)
-    print("[TRAIN] Training complete!")
+    print(f"[TRAIN] Training complete! ({model.n_iter_} boosting iterations)")
     return model
 
 
@@ -110,10 +153,33 @@ def evaluate_model(model, X_test, y_test, label_encoder):
     return accuracy, y_pred
 
 
+def export_onnx(model, num_features: int, onnx_file: Path):
+    """Export model to ONNX for onnxruntime inference (optional)"""
+    try:
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+    except ImportError:
+        print("  [SKIP] skl2onnx not installed - ONNX export skipped")
+        # Never leave an outdated export next to the new pickle
+        if onnx_file.exists():
+            onnx_file.unlink()
+        return
+
+    onnx_model = convert_sklearn(
+        model,
+        initial_types=[("input", FloatTensorType([None, num_features]))],
+        options={id(model): {"zipmap": False}},
+    )
+    with onnx_file.open("wb") as f:
+        f.write(onnx_model.SerializeToString())
+    print(f"  ONNX model saved: {onnx_file}")
+
+
 def save_model(
     model,
     label_encoder,
     accuracy,
+    num_features: int,
     output_dir: str = "./models",
 ):
     """Save trained model and metadata"""
@@ -124,8 +190,12 @@ def save_model(
 
     # Save model
     model_file = output_path / "gesture_model.pkl"
-    joblib.dump(model, model_file)
-    print(f"  Model saved: {model_file}")
+    joblib.dump(model, model_file, compress=MODEL_COMPRESS)
+    print(f"  Model saved: {model_file} ({MODEL_COMPRESS[0]}, "
+          f"{model_file.stat().st_size / 1024:.0f} KB)")
+
+    # Save ONNX export (preferred by GestureRecognizer when present)
+    export_onnx(model, num_features, output_path / "gesture_model.onnx")
 
     # Save label encoder
     encoder_file = output_path / "label_encoder.pkl"
@@ -137,9 +207,9 @@ def save_model(
         "accuracy": float(accuracy),
         "num_classes": len(label_encoder.classes_),
         "classes": label_encoder.classes_.tolist(),
-        "model_type": "RandomForestClassifier",
-        "num_estimators": 100,
-        "feature_dim": 83,
+        "model_type": type(model).__name__,
+        "num_estimators": int(getattr(model, "n_iter_", 0)),
+        "feature_dim": num_features,
     }
 
     metadata_file = output_path / "model_metadata.json"
@@ -156,8 +226,11 @@ def main():
     print("=" * 60)
 
     # Load dataset
-    dataset_path = "./data/processed/combined_all_datasets.npz"
-    if not os.path.exists(dataset_path):
+    dataset_path = "./data/processed/combined_all_datasets"
+    if not (
+        os.path.exists(f"{dataset_path}_features.npy")
+        or os.path.exists(f"{dataset_path}.npz")
+    ):
         print(f"\n[ERROR] Dataset not found: {dataset_path}")
         print("        Please run: python scripts/process_all_datasets.py")
         return
@@ -178,7 +251,7 @@ def main():
     )
 
     # Save
-    save_model(model, label_encoder, accuracy)
+    save_model(model, label_encoder, accuracy, X_train.shape[1])
 
     # Summary
     print("\n" + "=" * 60)
@@ -187,13 +260,14 @@ def main():
 
     print("\n[SUMMARY]")
     print(f"  Accuracy: {accuracy * 100:.2f}%")
-    print("  Model: Random Forest (100 trees)")
+    print(f"  Model: HistGradientBoosting ({model.n_iter_} iterations)")
     print(f"  Classes: {len(label_encoder.classes_)}")
     print(f"  Train samples: {len(X_train)}")
     print(f"  Test samples: {len(X_test)}")
 
     print("\n  Model files:")
     print("   - models/gesture_model.pkl")
+    print("   - models/gesture_model.onnx (if skl2onnx is installed)")
     print("   - models/label_encoder.pkl")
     print("   - models/model_metadata.json")
 
@@ -0,0 +1,43 @@
+# backend/tests/test_dataset_downloader.py
+
+"""
+Test HaGRID Downloader gesture mapping
+"""
+import sys
+import os
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.utils.dataset_downloader import HaGRIDDownloader
+
+
+def test_gesture_sources_unique():
+    """Each HaGRID source appears once (no silently overwritten entries)"""
+    sources = [src for src, _ in HaGRIDDownloader.GESTURE_SOURCES]
+    assert len(sources) == len(set(sources)), f"Duplicate HaGRID sources: {sources}"
+    assert len(HaGRIDDownloader.GESTURE_MAPPING) == len(HaGRIDDownloader.GESTURE_SOURCES)
+
+
+def test_gesture_mapping_one_to_one():
+    """Each of our gesture labels comes from exactly one HaGRID source"""
+    labels = list(HaGRIDDownloader.GESTURE_MAPPING.values())
+    assert len(labels) == len(set(labels)), f"Labels with several sources: {labels}"
+
+
+def test_gesture_sources_downloadable():
+    """Every mapped source has a download URL"""
+    missing = set(HaGRIDDownloader.GESTURE_MAPPING) - set(HaGRIDDownloader.DATASET_URLS)
+    assert not missing, f"No URL for: {missing}"
+
+
+if __name__ == "__main__":
+    print("📥 HaGRID Downloader Test")
+    print("=" * 50)
+    
+    test_gesture_sources_unique()
+    test_gesture_mapping_one_to_one()
+    test_gesture_sources_downloadable()
+    
+    print("\n" + "=" * 50)
+    print("✅ All tests completed!")
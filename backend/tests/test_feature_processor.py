@@ -11,7 +11,9 @@ sys.path.insert(0, backend_dir)
 
 from app.services.hand_detector import HandDetector
 from app.services.camera_manager import CameraManager
+from app.services import feature_processor as feature_processor_module
 from app.services.feature_processor import FeatureProcessor
+from app.utils import landmark_ops
 import cv2
 import numpy as np
 
@@ -117,6 +119,42 @@ def test_feature_extraction():
         hand_detector.cleanup()
         print("\n✅ Test completed!")
 
+def _legacy_features(points):
+    """Original per-hand feature code (layout the model was trained on)"""
+    processor = FeatureProcessor()
+    centered = points - points[0]
+    max_distance = np.max(np.linalg.norm(centered, axis=1))
+    normalized = centered / max_distance if max_distance > 0 else centered
+    
+    return np.concatenate([
+        normalized.flatten(),
+        list(processor.calculate_distances(normalized).values()),
+        list(processor.calculate_angles(normalized).values())
+    ])
+
+def test_feature_paths_match_legacy(monkeypatch):
+    """Numba kernel, its plain-Python loops and the NumPy fallback all
+    produce the legacy 83-feature layout"""
+    points = np.random.default_rng(0).random((64, 21, 3))
+    expected = np.array([_legacy_features(hand) for hand in points])
+    assert expected.shape == (64, landmark_ops.NUM_FEATURES)
+    
+    out = np.empty((len(points), landmark_ops.NUM_FEATURES), dtype=np.float32)
+    paths = {'loops': landmark_ops._features_loops(points, out.copy())}
+    if landmark_ops.compute_features is not None:
+        paths['numba'] = landmark_ops.compute_features(points, out.copy())
+    
+    monkeypatch.setattr(feature_processor_module, 'compute_features', None)
+    monkeypatch.setattr(landmark_ops, 'normalize', landmark_ops._normalize_numpy)
+    monkeypatch.setattr(feature_processor_module, 'normalize', landmark_ops._normalize_numpy)
+    paths['numpy'] = feature_processor_module._compute_features(points)
+    
+    for name, features in paths.items():
+        assert features.shape == expected.shape, name
+        assert np.allclose(features, expected, rtol=1e-5, atol=1e-4), (
+            f"{name} path differs by up to {np.abs(features - expected).max()}"
+        )
+
 if __name__ == "__main__":
     print("🧮 Feature Processor Test")
     print("=" * 50)
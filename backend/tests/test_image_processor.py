@@ -0,0 +1,67 @@
+# backend/tests/test_image_processor.py
+
+"""
+Test Image Processor dataset files and image sampling
+"""
+import sys
+import os
+import random
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.utils.image_processor import ImageProcessor, _reservoir_sample
+from app.utils.landmark_ops import NUM_FEATURES
+from scripts.train_model import load_dataset
+import numpy as np
+
+
+def _features(num_rows, value):
+    return np.full((num_rows, NUM_FEATURES), value, dtype=np.float32)
+
+
+def test_combine_round_trip(tmp_path):
+    """Per-gesture files with different class tables combine and load back intact"""
+    # Two processors -> two class registries: palm.npz stores code 1 of
+    # [fist, palm], ok.npz code 0 of [ok] (same code as fist)
+    first = ImageProcessor(None, None, output_dir=tmp_path, num_workers=1)
+    first._save_gesture('fist', 3, _features(3, 1.0), [{}] * 3)
+    first._save_gesture('palm', 2, _features(2, 2.0), [{}] * 2)
+    second = ImageProcessor(None, None, output_dir=tmp_path, num_workers=1)
+    second._save_gesture('ok', 4, _features(4, 3.0), [{}] * 4)
+
+    stats = first.combine_processed_data('combined.npz')
+    assert stats['total_samples'] == 9
+    assert sorted(stats['gestures']) == ['fist', 'ok', 'palm']
+
+    features, labels = load_dataset(tmp_path / 'combined')
+    assert features.dtype == np.float32
+    assert features.shape == (9, NUM_FEATURES)
+
+    # Every row keeps its gesture, whichever file order combine used
+    expected = {'fist': 1.0, 'palm': 2.0, 'ok': 3.0}
+    for gesture, value in expected.items():
+        rows = features[labels == gesture]
+        assert len(rows) == {'fist': 3, 'palm': 2, 'ok': 4}[gesture]
+        assert np.all(rows == value), gesture
+
+
+def test_reservoir_sample_size_and_uniqueness():
+    """min(k, n) distinct items, for streams shorter and longer than k"""
+    for n, k in ((0, 5), (3, 5), (5, 5), (6, 5), (1000, 10), (1000, 1)):
+        sample = _reservoir_sample(range(n), k, random.Random(n * 31 + k))
+        assert len(sample) == min(k, n), (n, k)
+        assert len(set(sample)) == len(sample), (n, k)
+        assert all(0 <= item < n for item in sample)
+
+
+def test_reservoir_sample_seeded_per_gesture(tmp_path):
+    """Same gesture -> same sampled files on every run"""
+    for i in range(200):
+        (tmp_path / f"{i}.jpg").touch()
+    processor = ImageProcessor(None, None, output_dir=tmp_path / 'out', num_workers=1)
+
+    first = processor._find_images(tmp_path, 'fist', False, 20)
+    assert len(first) == 20
+    assert processor._find_images(tmp_path, 'fist', False, 20) == first
+    assert processor._find_images(tmp_path, 'palm', False, 20) != first
@@ -13,10 +13,23 @@ sys.path.insert(0, backend_dir)
 from app.services.camera_manager import CameraManager
 from app.services.hand_detector import HandDetector
 from app.services.feature_processor import FeatureProcessor
+from app.services.pipeline import FramePipeline, STATIC_DIFF_THRESHOLD
+from app.utils import frame_stats
 import cv2
-import time
 import numpy as np
 
+# Overlay constants (BGR colors), resolved once instead of per frame
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+QUIT_KEY = ord('q')
+GREEN = (0, 255, 0)
+RED = (0, 0, 255)
+CYAN = (255, 255, 0)
+YELLOW = (0, 255, 255)
+WHITE = (255, 255, 255)
+
+# Per-frame console stats only with GRS_VERBOSE=1
+VERBOSE = os.environ.get("GRS_VERBOSE", "0") == "1"
+
 def test_complete_pipeline():
     """Test complete gesture detection pipeline"""
     print("\n" + "=" * 60)
@@ -39,7 +52,11 @@ def test_complete_pipeline():
     camera_manager = CameraManager()
     hand_detector = HandDetector(
         max_num_hands=2,
-        min_detection_confidence=0.7
+        min_detection_confidence=0.7,
+        model_complexity=0,  # Lite model: interactive, FPS-bound loop
+        # Tasks landmarker ($GRS_HAND_LANDMARKER) on the GPU when available;
+        # falls back to CPU, or to legacy Hands without a .task model
+        delegate='gpu'
     )
     feature_processor = FeatureProcessor()
     print("✅ All components initialized\n")
@@ -62,88 +79,80 @@ def test_complete_pipeline():
     detection_count = 0
     feature_extraction_count = 0
     
-    fps_start = time.time()
-    fps_frames = 0
+    fps_counter = frame_stats.FpsCounter(window=30)
     fps = 0
     
     print("Starting detection loop...\n")
     
+    # STEP 1-3 (camera -> hand detection -> features) run on pipeline
+    # threads; this loop only draws and displays. Until a hand shows up,
+    # detection runs on every 5th frame only, and while the scene stays
+    # still the last detection is reused
+    pipeline = FramePipeline(
+        camera_manager, hand_detector, feature_processor,
+        idle_detect_interval=5, static_diff_threshold=STATIC_DIFF_THRESHOLD
+    )
+    pipeline.start()
+    
     try:
-        while True:
+        while pipeline.running:
+            result = pipeline.get()
+            if result is None:
+                continue
             frame_count += 1
             
-            # STEP 1: Get frame from camera
-            frame = camera_manager.get_frame(0)
-            if frame is None:
-                print("❌ Failed to get frame")
-                break
-            
-            # STEP 2: Detect hands
-            image_rgb, results = hand_detector.detect_hands(frame)
-            hands_info = hand_detector.get_hand_info(results)
-            landmarks_list = hand_detector.extract_landmarks(results)
+            results = result.results
+            hands_info = result.hands_info
+            landmarks_list = result.landmarks
+            features_list = result.features
             
             if landmarks_list:
                 detection_count += 1
-            
-            # STEP 3: Extract features for each hand
-            features_list = []
-            for hand_landmarks in landmarks_list:
-                try:
-                    features = feature_processor.extract_features(hand_landmarks)
-                    features_list.append(features)
-                    feature_extraction_count += 1
-                except Exception as e:
-                    print(f"⚠️ Feature extraction error: {e}")
+            feature_extraction_count += len(features_list)
             
             # Calculate FPS
-            fps_frames += 1
-            if fps_frames >= 30:
-                fps_end = time.time()
-                fps = fps_frames / (fps_end - fps_start)
-                fps_start = fps_end
-                fps_frames = 0
+            fps = fps_counter.update()
             
-            # Draw everything
-            output_image = hand_detector.draw_landmarks(image_rgb, results)
+            # Draw everything (in place on the frame)
+            output_image = hand_detector.draw_landmarks(None, results, frame=result.frame)
             
             # Display stats
             y_pos = 30
             
             # FPS
             cv2.putText(output_image, f"FPS: {fps:.1f}", (10, y_pos),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                       FONT, 1, GREEN, 2)
             y_pos += 40
             
             # Frames processed
             cv2.putText(output_image, f"Frames: {frame_count}", (10, y_pos),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                       FONT, 0.7, WHITE, 2)
             y_pos += 35
             
             # Hands detected
-            color = (0, 255, 0) if landmarks_list else (0, 0, 255)
+            color = GREEN if landmarks_list else RED
             cv2.putText(output_image, f"Hands: {len(landmarks_list)}", (10, y_pos),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+                       FONT, 0.7, color, 2)
             y_pos += 35
             
             # Features extracted
             if features_list:
                 cv2.putText(output_image, f"Features: {len(features_list[0])}", (10, y_pos),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+                           FONT, 0.7, CYAN, 2)
                 y_pos += 35
             
             # Hand info
             for i, hand_info in enumerate(hands_info):
                 text = f"{hand_info['type']}: {hand_info['confidence']:.2f}"
                 cv2.putText(output_image, text, (10, y_pos),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+                           FONT, 0.6, YELLOW, 2)
                 y_pos += 30
             
             # Show
             cv2.imshow('Integration Test - Day 3', output_image)
             
             # Console output (every 30 frames)
-            if frame_count % 30 == 0 and landmarks_list:
+            if VERBOSE and frame_count % 30 == 0 and landmarks_list:
                 print(f"\n[Frame {frame_count}]")
                 print(f"  Hands detected: {len(landmarks_list)}")
                 print(f"  Features extracted: {len(features_list)}")
@@ -153,8 +162,8 @@ def test_complete_pipeline():
                 for hand_info in hands_info:
                     print(f"  {hand_info['type']} hand - confidence: {hand_info['confidence']:.3f}")
             
-            # Quit
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            # Quit (pollKey handles window events without waitKey's 1 ms sleep)
+            if cv2.pollKey() & 0xFF == QUIT_KEY:
                 break
     
     except KeyboardInterrupt:
@@ -162,6 +171,7 @@ def test_complete_pipeline():
     
     finally:
         # Cleanup
+        pipeline.stop()
         cv2.destroyAllWindows()
         camera_manager.cleanup()
         hand_detector.cleanup()
@@ -171,7 +181,7 @@ def test_complete_pipeline():
         print("📊 FINAL STATISTICS")
         print("=" * 60)
         print(f"Total frames processed: {frame_count}")
-        print(f"Hands detected: {detection_count} ({detection_count/frame_count*100:.1f}%)")
+        print(f"Hands detected: {detection_count} ({detection_count/max(frame_count, 1)*100:.1f}%)")
         print(f"Features extracted: {feature_extraction_count}")
         print(f"Average FPS: {fps:.1f}")
         print("\n✅ Integration test completed successfully!")